@@ -2,9 +2,13 @@ from flask import Flask, request, jsonify
 from flask_swagger_ui import get_swaggerui_blueprint
 from flask_graphql import GraphQLView
 import graphene
-import re
-from scraper import scrape_links, preprocess_urls, is_valid_url
+from crawler import Crawler
+from scheduler import default_scheduler
+from page_cache import PageCache
+from seen_set import make_seen_set
+from domain_engines import domain_engines
 from url_ranking_model import UrlRanker
+from feedback import apply_pending_feedback
 from database import (
     init_db,
     save_links,
@@ -13,9 +17,18 @@ from database import (
     get_document_links,
     search_links_by_keyword,
     get_avg_score_per_domain,
+    get_link_anchor_text,
+    save_feedback,
+)
+from config import (
+    DEEP_SCRAPE_CONCURRENCY,
+    DEEP_SCRAPE_DEADLINE,
+    BROWSER_POOL_SIZE,
+    CRAWL_MAX_DEPTH,
+    CRAWL_MAX_PAGES,
+    PAGE_CACHE_ENABLED,
+    MODEL_REFRESH_INTERVAL,
 )
-import pandas as pd
-from config import HIGH_SCORE_THRESHOLD
 
 app = Flask(__name__)
 
@@ -25,6 +38,17 @@ init_db()
 # Load ML model
 ranker = UrlRanker("model.pkl")
 
+
+@app.before_request
+def refresh_model():
+    """Pick up model versions published by other app processes or feedback.py."""
+    try:
+        ranker.refresh(MODEL_REFRESH_INTERVAL)
+    except ValueError as e:
+        # Keep serving the loaded model
+        print(f"Not switching to the latest model artifact: {e}")
+
+
 # Swagger setup
 SWAGGER_URL = "/swagger"
 API_URL = "/static/swagger.json"
@@ -57,7 +81,31 @@ def swagger_json():
                                 "in": "query",
                                 "required": True,
                                 "type": "string",
-                            }
+                            },
+                            {
+                                "name": "concurrency",
+                                "in": "query",
+                                "type": "integer",
+                                "required": False,
+                            },
+                            {
+                                "name": "deadline",
+                                "in": "query",
+                                "type": "number",
+                                "required": False,
+                            },
+                            {
+                                "name": "max_depth",
+                                "in": "query",
+                                "type": "integer",
+                                "required": False,
+                            },
+                            {
+                                "name": "max_pages",
+                                "in": "query",
+                                "type": "integer",
+                                "required": False,
+                            },
                         ],
                         "responses": {
                             "200": {"description": "Scraped and ranked links"},
@@ -141,6 +189,86 @@ def swagger_json():
                         },
                     }
                 },
+                "/crawl-queues": {
+                    "get": {
+                        "summary": "Retrieve per-host crawl queue depths",
+                        "responses": {"200": {"description": "Queue depths retrieved"}},
+                    }
+                },
+                "/ranker-stats": {
+                    "get": {
+                        "summary": "Retrieve ranking stage timings and cache stats",
+                        "responses": {"200": {"description": "Ranker stats retrieved"}},
+                    }
+                },
+                "/feedback": {
+                    "post": {
+                        "summary": "Label links as relevant (1) or not (0) and "
+                        "update the model",
+                        "parameters": [
+                            {
+                                "name": "body",
+                                "in": "body",
+                                "required": True,
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "labels": {
+                                            "type": "array",
+                                            "items": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "url": {"type": "string"},
+                                                    "anchor_text": {"type": "string"},
+                                                    "label": {
+                                                        "type": "integer",
+                                                        "enum": [0, 1],
+                                                    },
+                                                },
+                                            },
+                                        }
+                                    },
+                                },
+                            }
+                        ],
+                        "responses": {
+                            "200": {"description": "Feedback recorded and applied"},
+                            "400": {"description": "Invalid or unknown link"},
+                        },
+                    }
+                },
+                "/domain-engines": {
+                    "get": {
+                        "summary": "Retrieve the fetch engine learned per domain",
+                        "responses": {
+                            "200": {"description": "Domain engines retrieved"}
+                        },
+                    },
+                    "post": {
+                        "summary": "Pin a domain to an engine (null engine unpins)",
+                        "parameters": [
+                            {
+                                "name": "body",
+                                "in": "body",
+                                "required": True,
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "domain": {"type": "string"},
+                                        "engine": {
+                                            "type": "string",
+                                            "enum": ["http", "chromium", "firefox"],
+                                        },
+                                    },
+                                },
+                            }
+                        ],
+                        "responses": {
+                            "200": {"description": "Domain engine pinned"},
+                            "400": {"description": "Invalid domain or engine"},
+                        },
+                    },
+                },
                 "/graphql": {
                     "post": {
                         "summary": "Execute GraphQL queries",
@@ -176,79 +304,51 @@ def swagger_json():
 @app.route("/scrape", methods=["GET"])
 def scrape():
     """
-    Scrape a webpage, rank links, and scrape high-value non-file URLs by one more level.
+    Scrape a webpage, rank links, and keep crawling the highest-ranked
+    non-file URLs until the depth, page or time budget runs out.
     """
     url = request.args.get("url")
     if not url:
         return jsonify({"error": "URL parameter is required"}), 400
 
-    # Perform first scrape
-    links = scrape_links(url)
-    if not links:
+    try:
+        concurrency = int(request.args.get("concurrency", DEEP_SCRAPE_CONCURRENCY))
+        deadline = float(request.args.get("deadline", DEEP_SCRAPE_DEADLINE))
+        max_depth = int(request.args.get("max_depth", CRAWL_MAX_DEPTH))
+        max_pages = int(request.args.get("max_pages", CRAWL_MAX_PAGES))
+    except ValueError:
+        return jsonify({"error": "Crawl parameters must be numbers"}), 400
+    concurrency = max(1, min(concurrency, BROWSER_POOL_SIZE))
+
+    # Best-first crawl, only high-value non-file links are followed
+    crawler = Crawler(
+        ranker,
+        max_depth=max_depth,
+        max_pages=max_pages,
+        max_time=deadline,
+        concurrency=concurrency,
+        page_cache=PageCache() if PAGE_CACHE_ENABLED else None,
+        seen=make_seen_set(),
+    )
+    ranked_df = crawler.crawl(url)
+    if ranked_df.empty:
         return jsonify({"error": "No links found"}), 404
 
-    urls, anchor_texts = preprocess_urls(links, url)
-    ranked_df = ranker.rank_urls(urls, anchor_texts)
-    # Track source page
-    ranked_df["scraped_from"] = url
-
-    # Function to check if URL ends with a file extension
-    def is_file_link(link):
-        return bool(
-            re.search(r"\.[a-zA-Z0-9]{2,5}$", link)
-        )  # Matches URLs ending in ".ext"
-
-    # Extract only high-value URLs that are not files
-    # Ranking threshold defined in config
-    high_value_urls = ranked_df[
-        (ranked_df["score"] > HIGH_SCORE_THRESHOLD)
-        & (~ranked_df["url"].apply(is_file_link))
-    ]
-
-    # print("HIGH VALUE LINKES")
-    # print(high_value_urls)
-
-    # List to store second-level data
-    second_level_data = []
-
-    # Scrape one more level on high-value non-file links
-    for new_url in high_value_urls["url"]:
-        print(f"Deep scraping: {new_url}")
-
-        if not is_valid_url(new_url):
-            print(f"Skipping deep scrape invalid URL: {url}")
-            continue
-
-        second_level_links = scrape_links(new_url)
-
-        if second_level_links:
-            second_urls, second_anchor_texts = preprocess_urls(
-                second_level_links, new_url
-            )
-            second_ranked_df = ranker.rank_urls(second_urls, second_anchor_texts)
-            second_ranked_df["scraped_from"] = new_url
-
-            # Collect second-level data
-            second_level_data.append(second_ranked_df)
-
-    print(second_level_data)
-
-    # If any second-level data exists, append it to the main dataframe
-    if second_level_data:
-        ranked_df = pd.concat([ranked_df] + second_level_data, ignore_index=True)
-
     ranked_df = (
         ranked_df.drop_duplicates(subset=["url"])
         .sort_values(by="score", ascending=False)
         .reset_index(drop=True)
     )
 
-    # Save results to DuckDB
-    save_links(ranked_df)
+    # Save results to DuckDB, rows from unchanged pages are already stored
+    from_cache = ranked_df.pop("from_cache").astype(bool)
+    fresh_df = ranked_df[~from_cache]
+    if not fresh_df.empty:
+        save_links(fresh_df.copy())
 
     return jsonify(
         {
-            "message": f"Scraped {len(ranked_df)} links from {url} (including second-level scrapes)",
+            "message": f"Scraped {len(ranked_df)} links from {crawler.pages_fetched} pages starting at {url}",
             "ranked_links": ranked_df.to_dict(orient="records"),
         }
     )
@@ -292,6 +392,85 @@ def search_links():
     return jsonify({"search_results": results})
 
 
+@app.route("/crawl-queues", methods=["GET"])
+def crawl_queues():
+    """Retrieve per-host queue depths from the politeness scheduler."""
+    return jsonify({"hosts": default_scheduler.queue_depths()})
+
+
+@app.route("/ranker-stats", methods=["GET"])
+def ranker_stats():
+    """Retrieve per-stage ranking timings and score cache stats."""
+    return jsonify(
+        {
+            "model_version": ranker.model_version,
+            "stages": ranker.stats.stats(),
+            "score_cache": ranker.score_cache.stats(),
+        }
+    )
+
+
+@app.route("/feedback", methods=["POST"])
+def feedback():
+    """
+    Record relevance labels for links, {"labels": [{"url", "label", "anchor_text"}]}
+    and fold them into the model. anchor_text defaults to the stored link's.
+    """
+    body = request.get_json(silent=True)
+    labels = body.get("labels") if isinstance(body, dict) else None
+    if not isinstance(labels, list):
+        return jsonify({"error": "Labels must be a list"}), 400
+    rows = []
+    for item in labels:
+        if not isinstance(item, dict):
+            return jsonify({"error": "Each label must be an object"}), 400
+        url, label = item.get("url"), item.get("label")
+        # True == 1 in Python, so bools would pass the 0/1 check
+        valid_url = isinstance(url, str) and url
+        if not valid_url or isinstance(label, bool) or label not in (0, 1):
+            return jsonify({"error": "Each label needs a url and a 0/1 label"}), 400
+        if "anchor_text" in item:
+            anchor_text = item["anchor_text"]
+            if not isinstance(anchor_text, str) or not anchor_text:
+                return jsonify({"error": "anchor_text must be a non-empty string"}), 400
+        else:
+            anchor_text = get_link_anchor_text(url)
+        if anchor_text is None:
+            return jsonify({"error": f"Link not stored, pass anchor_text: {url}"}), 400
+        rows.append((url, anchor_text, label))
+    if not rows:
+        return jsonify({"error": "Labels are required"}), 400
+
+    save_feedback(rows)
+    try:
+        model_version = apply_pending_feedback(ranker)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"recorded": len(rows), "model_version": model_version})
+
+
+@app.route("/domain-engines", methods=["GET", "POST"])
+def domain_engine_settings():
+    """
+    List the fetch engine learned per domain, or pin one with
+    {"domain": ..., "engine": "http" | "chromium" | "firefox" | null}.
+    """
+    if request.method == "POST":
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return jsonify({"error": "Body must be a JSON object"}), 400
+        domain, engine = body.get("domain"), body.get("engine")
+        if not isinstance(domain, str) or not domain:
+            return jsonify({"error": "Domain is required"}), 400
+        if engine is not None and not isinstance(engine, str):
+            return jsonify({"error": "Engine must be a string or null"}), 400
+        try:
+            domain_engines.pin(domain, engine)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    return jsonify({"domain_engines": domain_engines.all()})
+
+
 @app.route("/avg-score-per-domain", methods=["GET"])
 def avg_score_per_domain():
     """Retrieve the average relevance score per domain."""
@@ -0,0 +1,195 @@
+import asyncio
+import atexit
+import threading
+
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright, Error
+from config import BROWSER_POOL_SIZE, BROWSER_MAX_PAGES
+
+
+class PooledBrowser:
+    """
+    A launched browser plus how many pages it has served.
+    """
+
+    def __init__(self, engine, browser):
+        self.engine = engine
+        self.browser = browser
+        self.pages_served = 0
+
+    def is_healthy(self):
+        return self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Long-lived, size-bounded pool of headless browsers. Borrowed and idle
+    browsers of every engine together count against size.
+
+    Playwright runs on a background event loop, so any thread (Flask request
+    threads included) can borrow a browser through run().
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_pages=BROWSER_MAX_PAGES):
+        self.size = size
+        self.max_pages = max_pages
+        self.stats = {
+            "launched": 0,
+            "recycled": 0,
+            "unhealthy": 0,
+            "borrowed": 0,
+            "evicted": 0,
+        }
+
+        self._playwright = None
+        self._idle = {}  # engine -> list of idle PooledBrowser
+        self._slots = None
+        self._in_use = 0  # Borrowed browsers, including ones being launched
+        self._closed = False
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="browser-pool", daemon=True
+        )
+        self._thread.start()
+
+    def run(self, coro, timeout=None):
+        """
+        Run a coroutine on the pool's event loop and wait for its result.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout)
+
+    async def _start(self):
+        """
+        Start Playwright lazily on first use.
+        """
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+            self._slots = asyncio.Semaphore(self.size)
+
+    async def _launch(self, engine):
+        launcher = getattr(self._playwright, engine)
+        browser = await launcher.launch(headless=True)
+        self.stats["launched"] += 1
+        return PooledBrowser(engine, browser)
+
+    async def _discard(self, pooled):
+        try:
+            await pooled.browser.close()
+        except Error:
+            pass  # Already gone, nothing to clean up
+
+    async def _make_room(self):
+        """
+        Close the oldest idle browsers of other engines until the borrowed
+        and idle browsers fit in size again.
+        """
+        while self._in_use + sum(map(len, self._idle.values())) > self.size:
+            idle = next(browsers for browsers in self._idle.values() if browsers)
+            self.stats["evicted"] += 1
+            await self._discard(idle.pop(0))
+
+    async def acquire(self, engine="chromium"):
+        """
+        Borrow a healthy browser, launching one if none are idle.
+        """
+        await self._start()
+        await self._slots.acquire()
+        self._in_use += 1
+
+        idle = self._idle.setdefault(engine, [])
+        try:
+            while idle:
+                pooled = idle.pop()
+                if pooled.is_healthy():
+                    self.stats["borrowed"] += 1
+                    return pooled
+                # Crashed or disconnected while idle
+                self.stats["unhealthy"] += 1
+                await self._discard(pooled)
+
+            # Idle browsers of other engines would push the total past size
+            await self._make_room()
+            pooled = await self._launch(engine)
+            self.stats["borrowed"] += 1
+            return pooled
+        except BaseException:
+            self._in_use -= 1
+            self._slots.release()
+            raise
+
+    async def release(self, pooled):
+        """
+        Return a browser to the pool, recycling it after max_pages pages.
+        """
+        try:
+            pooled.pages_served += 1
+            if self._closed or not pooled.is_healthy():
+                self.stats["unhealthy"] += 1
+                await self._discard(pooled)
+            elif pooled.pages_served >= self.max_pages:
+                self.stats["recycled"] += 1
+                await self._discard(pooled)
+            else:
+                self._idle.setdefault(pooled.engine, []).append(pooled)
+        finally:
+            self._in_use -= 1
+            self._slots.release()
+
+    @asynccontextmanager
+    async def page(self, engine="chromium", route_handler=None):
+        """
+        Borrow a browser and yield a page in a fresh, isolated context.
+        route_handler, if given, intercepts every request the page makes.
+        """
+        pooled = await self.acquire(engine)
+        context = None
+        try:
+            context = await pooled.browser.new_context()
+            if route_handler is not None:
+                await context.route("**/*", route_handler)
+            yield await context.new_page()
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Error:
+                    pass  # Browser died mid-page, release() will drop it
+            await self.release(pooled)
+
+    async def _shutdown(self):
+        self._closed = True
+        for browsers in self._idle.values():
+            for pooled in browsers:
+                await self._discard(pooled)
+        self._idle.clear()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        """
+        Close all browsers and stop the background loop.
+        """
+        if not self._loop.is_running():
+            return
+        self.run(self._shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """
+    Return the process-wide browser pool, creating it on first use.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
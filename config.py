@@ -1,6 +1,57 @@
 # Path to trained model
 MODEL_PATH = "model.pkl"
 
+# Versioned model artifacts (manifest + memory-mapped arrays), preferred over the pickle
+MODEL_ARTIFACT_DIR = "model_artifact"
+
+# Seconds between app checks of LATEST for a model published by another process
+MODEL_REFRESH_INTERVAL = 30
+
+# Hyperparameter search in train_model.py --search
+TRAIN_CV_FOLDS = 5
+TRAIN_SEARCH_SCORING = "average_precision"
+TRAIN_PARAM_GRID = {
+    "lr__C": [0.1, 1.0, 10.0],
+    "features__tfidf__ngram_range": [(1, 1), (1, 2), (1, 3)],
+    "features__tfidf__max_features": [250, 500, 1000],
+}
+
+# Streaming training from a CSV/Parquet file or DuckDB query (train_model.py --source)
+TRAIN_CHUNK_SIZE = 50_000  # Rows per chunk, memory stays flat beyond this
+TRAIN_STREAM_EPOCHS = 1
+TRAIN_HASHING_FEATURES = 2**18  # Hashed text columns, replaces the TF-IDF vocabulary
+TRAIN_SGD_ALPHA = 1e-5  # L2 strength of the streaming SGD logistic regression
+
+# Online updates from labeled feedback (steps in standardized feature space)
+FEEDBACK_LEARNING_RATE = 0.1
+FEEDBACK_EPOCHS = 50
+FEEDBACK_L2 = 0.1  # Pull toward the current weights, higher = smaller updates
+
+# Pre-trained word embeddings and their local memory-mapped store
+EMBEDDINGS_NAME = "glove-wiki-gigaword-50"
+EMBEDDINGS_PATH = "embeddings/glove-wiki-gigaword-50.kv"
+
+# Pruned embedding table built next to the model by train_model.py
+PRUNED_EMBEDDINGS_PATH = "model_embeddings.kv"
+
+# Storage type of the pruned table, "float16" halves it again
+PRUNED_EMBEDDINGS_DTYPE = "float32"
+
+# Most frequent GloVe words always kept in the pruned table
+EMBEDDINGS_FREQUENT_WORDS = 20000
+
+# Stored links outside the training set the pruned table's drift is measured on
+EMBEDDINGS_DRIFT_SAMPLE = 1000
+
+# Max link scores kept in UrlRanker's score cache
+SCORE_CACHE_SIZE = 100_000
+
+# Seconds a cached score stays valid, None keeps it until evicted
+SCORE_CACHE_TTL = None
+
+# Links per task when scoring across a process pool
+PARALLEL_CHUNK_SIZE = 20_000
+
 # Path to DuckDB file
 DB_FILE = "scraper.duckdb"
 
@@ -126,3 +177,100 @@ NON_PRIORITY_KEY_WORDS = [
     "tickets",
     "request",
 ]
+
+# Max browsers the scraper keeps open at once
+BROWSER_POOL_SIZE = 4
+
+# Recycle a pooled browser after this many pages
+BROWSER_MAX_PAGES = 50
+
+# Max second-level pages scraped at the same time per /scrape request
+DEEP_SCRAPE_CONCURRENCY = 4
+
+# Seconds before unfinished second-level scrapes are cancelled
+DEEP_SCRAPE_DEADLINE = 60
+
+# Crawl budget: link depth below the seed page (1 = seed plus one more level)
+CRAWL_MAX_DEPTH = 1
+
+# Crawl budget: pages fetched per crawl, seed included
+CRAWL_MAX_PAGES = 50
+
+# Only follow links on the seed's site (subdomains included)
+CRAWL_SAME_DOMAIN = True
+
+# How pages are fetched: "auto" (plain HTTP first, browser when needed), "http" or "browser"
+FETCH_MODE = "auto"
+
+# Always fetch these domains with the given engine: "http", "chromium" or "firefox"
+DOMAIN_ENGINE_OVERRIDES = {}
+
+# Seconds before a plain HTTP fetch gives up
+HTTP_FETCH_TIMEOUT = 10
+
+# Max response bytes read by the HTTP fetcher
+HTTP_FETCH_MAX_BYTES = 5 * 1024 * 1024
+
+# User agent sent by the HTTP fetcher
+HTTP_USER_AGENT = "Mozilla/5.0 (compatible; HighValueLinkScraper/1.0)"
+
+# Resource types never downloaded while scraping, we only need the anchors
+BLOCKED_RESOURCE_TYPES = ["image", "media", "font", "stylesheet", "imageset"]
+
+# Analytics, ads and widget hosts that are always blocked (subdomains included)
+BLOCKED_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.net",
+    "platform.twitter.com",
+    "youtube.com",
+    "vimeo.com",
+    "hotjar.com",
+    "newrelic.com",
+    "nr-data.net",
+    "addthis.com",
+    "sharethis.com",
+    "siteimproveanalytics.com",
+]
+
+# Block every third-party request that is not allow-listed below
+BLOCK_THIRD_PARTY_REQUESTS = False
+
+# Third-party hosts still allowed when BLOCK_THIRD_PARTY_REQUESTS is on
+ALLOWED_THIRD_PARTY_DOMAINS = [
+    "cdnjs.cloudflare.com",
+    "ajax.googleapis.com",
+    "code.jquery.com",
+    "cdn.jsdelivr.net",
+]
+
+# Politeness: max requests in flight to a single host
+HOST_MAX_IN_FLIGHT = 2
+
+# Politeness: max requests per second to a single host
+HOST_REQUESTS_PER_SECOND = 2.0
+
+# Longest robots.txt Crawl-delay we honour, in seconds
+MAX_CRAWL_DELAY = 10
+
+# Skip re-rendering and re-ranking pages that are unchanged since the last crawl
+PAGE_CACHE_ENABLED = True
+
+# Query params dropped during URL canonicalization (utm_* params are always dropped)
+TRACKING_PARAMS = ["fbclid", "gclid", "msclkid", "mc_cid", "mc_eid", "_ga", "_gl"]
+
+# Cross-crawl seen-set consulted before fetching: None (per crawl only),
+# "duckdb" (exact, expires after SEEN_TTL_HOURS) or "bloom" (compact, for large
+# crawl campaigns; delete BLOOM_FILTER_PATH to reset it)
+SEEN_SET_BACKEND = None
+
+# Pages fetched within this many hours are skipped by the "duckdb" seen-set
+SEEN_TTL_HOURS = 24
+
+# Bloom filter seen-set settings
+BLOOM_FILTER_PATH = "seen_urls.bloom"
+BLOOM_FILTER_CAPACITY = 10_000_000
+BLOOM_FILTER_ERROR_RATE = 0.001
@@ -0,0 +1,191 @@
+import heapq
+import json
+import re
+import time
+import pandas as pd
+
+from urllib.parse import urlparse
+from scraper import scrape_many, preprocess_urls, is_valid_url, canonicalize_url
+from url_utils import same_site
+from config import (
+    HIGH_SCORE_THRESHOLD,
+    DEEP_SCRAPE_CONCURRENCY,
+    DEEP_SCRAPE_DEADLINE,
+    CRAWL_MAX_DEPTH,
+    CRAWL_MAX_PAGES,
+    CRAWL_SAME_DOMAIN,
+)
+
+
+def is_file_link(link):
+    """
+    Check if URL ends with a file extension, e.g. ".pdf".
+    """
+    return bool(re.search(r"\.[a-zA-Z0-9]{2,5}$", link))
+
+
+class Crawler:
+    """
+    Best-first crawler. Pages wait in a priority-queue frontier ordered by
+    their UrlRanker score, so the most promising pages are fetched first
+    until the depth, page or time budget runs out.
+    """
+
+    def __init__(
+        self,
+        ranker,
+        max_depth=CRAWL_MAX_DEPTH,
+        max_pages=CRAWL_MAX_PAGES,
+        max_time=DEEP_SCRAPE_DEADLINE,
+        same_domain=CRAWL_SAME_DOMAIN,
+        min_score=HIGH_SCORE_THRESHOLD,
+        concurrency=DEEP_SCRAPE_CONCURRENCY,
+        page_cache=None,
+        seen=None,
+    ):
+        self.ranker = ranker
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.max_time = max_time
+        self.same_domain = same_domain
+        self.min_score = min_score
+        self.concurrency = concurrency
+        self.page_cache = page_cache
+        self.seen = seen  # Cross-crawl seen-set, see seen_set.make_seen_set
+
+        self.frontier = []  # heap of (-score, seq, url, depth)
+        self.enqueued = set()
+        self.pages_fetched = 0
+        self._seq = 0
+
+    def _push(self, url, score, depth):
+        if url in self.enqueued:
+            return
+        if depth > 0 and self.seen is not None and url in self.seen:
+            return  # Fetched by an earlier crawl
+        self.enqueued.add(url)
+        heapq.heappush(self.frontier, (-score, self._seq, url, depth))
+        self._seq += 1
+
+    def _should_follow(self, url, score, seed_host):
+        """
+        Only follow high-value, in-scope, non-file links.
+        """
+        if score <= self.min_score or is_file_link(url) or not is_valid_url(url):
+            return False
+        if self.same_domain:
+            return same_site(urlparse(url).hostname or "", seed_host)
+        return True
+
+    def _next_batch(self):
+        """
+        Pop the best pages from the frontier, up to concurrency and page budget.
+        """
+        budget = min(self.concurrency, self.max_pages - self.pages_fetched)
+        batch = []
+        while self.frontier and len(batch) < budget:
+            _, _, url, depth = heapq.heappop(self.frontier)
+            batch.append((url, depth))
+        return batch
+
+    def _rank_batch(self, page_links):
+        """
+        Rank a batch of fetched pages in one UrlRanker pass, reusing the page
+        cache for unchanged pages. links is None when the server answered 304
+        Not Modified. Pages with nothing to rank are left out.
+        """
+        model_version = self.ranker.model_version
+        ranked = {}
+        to_rank = {}
+
+        for page_url, links in page_links.items():
+            ranked_df = None
+            if self.page_cache is not None:
+                if links is None:
+                    entry = self.page_cache.get(page_url)
+                    ranked_df = self.page_cache.cached_ranking(entry, model_version)
+                    # Scored by an older model, re-rank the cached link set
+                    links = [tuple(link) for link in json.loads(entry["links"])]
+                else:
+                    ranked_df = self.page_cache.lookup_links(
+                        page_url, links, model_version
+                    )
+
+            if ranked_df is not None:
+                ranked_df["scraped_from"] = page_url
+                ranked_df["from_cache"] = True
+                ranked[page_url] = ranked_df
+            elif links:
+                to_rank[page_url] = links
+
+        fresh = self.ranker.rank_pages(
+            {
+                page_url: preprocess_urls(links, page_url)
+                for page_url, links in to_rank.items()
+            }
+        )
+        for page_url, ranked_df in fresh.items():
+            if self.page_cache is not None:
+                self.page_cache.put(
+                    page_url, to_rank[page_url], ranked_df, model_version
+                )
+            ranked_df["from_cache"] = False
+            ranked[page_url] = ranked_df
+
+        # Keep fetch order so results merge deterministically
+        return {url: ranked[url] for url in page_links if url in ranked}
+
+    def crawl(self, seed_url):
+        """
+        Crawl from seed_url, returns ranked links with scraped_from and
+        from_cache (True when the page was unchanged since the last crawl) columns.
+        """
+        started = time.monotonic()
+        seed_url = canonicalize_url(seed_url)
+        seed_host = urlparse(seed_url).hostname or ""
+        ranked_pages = []
+
+        self._push(seed_url, float("inf"), 0)
+
+        while self.frontier and self.pages_fetched < self.max_pages:
+            remaining = self.max_time - (time.monotonic() - started)
+            if remaining <= 0:
+                print(f"Crawl time budget reached after {self.pages_fetched} pages")
+                break
+
+            batch = self._next_batch()
+            depths = dict(batch)
+            print(f"Crawling {len(batch)} pages, {len(self.frontier)} in frontier")
+            page_links = scrape_many(
+                list(depths),
+                concurrency=self.concurrency,
+                deadline=remaining,
+                page_cache=self.page_cache,
+            )
+            self.pages_fetched += len(batch)
+            if self.seen is not None:
+                # Failed or timed-out fetches come back as [], retry them later
+                for page_url, links in page_links.items():
+                    if links is None or links:
+                        self.seen.add(page_url)
+
+            for page_url, ranked_df in self._rank_batch(page_links).items():
+                ranked_pages.append(ranked_df)
+
+                depth = depths[page_url]
+                if depth >= self.max_depth:
+                    continue
+
+                for link, score in zip(ranked_df["url"], ranked_df["score"]):
+                    if self._should_follow(link, score, seed_host):
+                        self._push(link, score, depth + 1)
+
+        if self.seen is not None:
+            self.seen.flush()
+
+        if not ranked_pages:
+            return pd.DataFrame(
+                columns=["url", "score", "anchor_text", "from_cache", "scraped_from"]
+            )
+
+        return pd.concat(ranked_pages, ignore_index=True)
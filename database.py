@@ -43,6 +43,73 @@ def init_db():
         conn.execute("CREATE INDEX IF NOT EXISTS idx_anchor_text ON links(anchor_text)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_domain ON links(domain)")
 
+        # Page cache for conditional re-crawls
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS page_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                links_hash TEXT,
+                links TEXT,
+                ranked TEXT,
+                model_version TEXT,
+                fetched_at TIMESTAMP
+            )
+        """
+        )
+
+        # Cross-crawl seen-set of fetched page fingerprints
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen_urls (
+                url_hash TEXT PRIMARY KEY,
+                url TEXT,
+                last_seen TIMESTAMP
+            )
+        """
+        )
+
+        # Fetch engine that works per domain
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS domain_engines (
+                domain TEXT PRIMARY KEY,
+                engine TEXT,
+                pinned BOOLEAN,
+                updated_at TIMESTAMP
+            )
+        """
+        )
+
+        # Relevance labels for online model updates, applied_version is the
+        # model version a label was folded into (NULL while pending)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS link_feedback (
+                url TEXT,
+                anchor_text TEXT,
+                label INTEGER,
+                applied_version TEXT,
+                created_at TIMESTAMP
+            )
+        """
+        )
+
+        # Extra features of training rows, keyed by a hash of url + anchor text
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS link_features (
+                content_hash TEXT PRIMARY KEY,
+                feature_version TEXT,
+                fuzzy_score DOUBLE,
+                embedding_similarity DOUBLE,
+                url_depth_score DOUBLE,
+                updated_at TIMESTAMP
+            )
+        """
+        )
+
     print("Database initialized with optimized indexing.")
 
 
@@ -66,6 +133,283 @@ def save_links(df):
     print(f"Saved {len(df)} links to database.")
 
 
+def get_cached_page(url):
+    """
+    Fetch a page cache entry by normalized URL, None if not cached.
+    """
+    with get_db_connection() as conn:
+        df = conn.execute("SELECT * FROM page_cache WHERE url = ?", (url,)).fetchdf()
+    return df.to_dict(orient="records")[0] if len(df) else None
+
+
+def save_cached_page(
+    url, etag, last_modified, links_hash, links, ranked, model_version
+):
+    """
+    Insert or replace a page cache entry.
+    """
+    with get_db_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO page_cache
+            VALUES (?, ?, ?, ?, ?, ?, ?, current_timestamp)
+            """,
+            (url, etag, last_modified, links_hash, links, ranked, model_version),
+        )
+
+
+def update_cached_page_validators(url, etag, last_modified):
+    """
+    Replace the ETag/Last-Modified of a page cache entry.
+    """
+    with get_db_connection() as conn:
+        conn.execute(
+            """
+            UPDATE page_cache
+            SET etag = ?, last_modified = ?, fetched_at = current_timestamp
+            WHERE url = ?
+            """,
+            (etag, last_modified, url),
+        )
+
+
+def get_seen_fingerprints(ttl_hours):
+    """
+    (fingerprint, age in seconds) of URLs fetched within the last ttl_hours.
+    """
+    with get_db_connection() as conn:
+        return conn.execute(
+            """
+            SELECT url_hash,
+                   epoch(CAST(current_timestamp AS TIMESTAMP)) - epoch(last_seen)
+            FROM seen_urls
+            WHERE last_seen > current_timestamp - to_hours(CAST(? AS INTEGER))
+            """,
+            (ttl_hours,),
+        ).fetchall()
+
+
+def save_seen_fingerprints(rows):
+    """
+    Record (url_hash, url) pairs as fetched now.
+    """
+    with get_db_connection() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO seen_urls VALUES (?, ?, current_timestamp)", rows
+        )
+
+
+def get_domain_engines():
+    """
+    Fetch learned engines as {domain: (engine, pinned)}.
+    """
+    with get_db_connection() as conn:
+        rows = conn.execute(
+            "SELECT domain, engine, pinned FROM domain_engines"
+        ).fetchall()
+    return {domain: (engine, pinned) for domain, engine, pinned in rows}
+
+
+def save_domain_engine(domain, engine, pinned):
+    """
+    Insert or replace a domain's engine, engine=None deletes it.
+    """
+    with get_db_connection() as conn:
+        if engine is None:
+            conn.execute("DELETE FROM domain_engines WHERE domain = ?", (domain,))
+        else:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO domain_engines
+                VALUES (?, ?, ?, current_timestamp)
+                """,
+                (domain, engine, pinned),
+            )
+
+
+def get_links_for_rescoring():
+    """
+    Fetch row id, url and anchor text of every stored link.
+    """
+    with get_db_connection() as conn:
+        return conn.execute(
+            "SELECT rowid AS row_id, url, anchor_text FROM links ORDER BY rowid"
+        ).fetchdf()
+
+
+def update_link_scores(df):
+    """
+    Write new scores back by row id, df has row_id and score columns.
+    """
+    with get_db_connection() as conn:
+        conn.register("new_scores", df[["row_id", "score"]])
+        conn.execute(
+            """
+            UPDATE links SET score = new_scores.score
+            FROM new_scores
+            WHERE links.rowid = new_scores.row_id
+            """
+        )
+        conn.unregister("new_scores")
+
+    print(f"Updated scores for {len(df)} links.")
+
+
+def get_link_anchor_text(url):
+    """
+    Anchor text of a stored link, None if the url isn't stored.
+    """
+    with get_db_connection() as conn:
+        row = conn.execute(
+            "SELECT anchor_text FROM links WHERE url = ? LIMIT 1", (url,)
+        ).fetchone()
+    return row[0] if row else None
+
+
+def save_feedback(rows):
+    """
+    Record (url, anchor_text, label) feedback rows as pending.
+    """
+    with get_db_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO link_feedback
+            VALUES (?, ?, ?, NULL, current_timestamp)
+            """,
+            rows,
+        )
+
+    print(f"Saved {len(rows)} feedback labels.")
+
+
+def get_feedback(pending_only=False):
+    """
+    Fetch feedback labels, optionally only those not yet applied.
+    """
+    query = "SELECT rowid AS row_id, url, anchor_text, label FROM link_feedback"
+    if pending_only:
+        query += " WHERE applied_version IS NULL"
+    with get_db_connection() as conn:
+        return conn.execute(query + " ORDER BY rowid").fetchdf()
+
+
+def mark_feedback_applied(row_ids, model_version):
+    """
+    Record the model version feedback rows were folded into.
+    """
+    with get_db_connection() as conn:
+        conn.executemany(
+            "UPDATE link_feedback SET applied_version = ? WHERE rowid = ?",
+            [(model_version, row_id) for row_id in row_ids],
+        )
+
+
+def get_link_features(wanted, feature_version):
+    """
+    Stored features for the content_hash column of wanted, current version only.
+    """
+    with get_db_connection() as conn:
+        conn.register("wanted", wanted[["content_hash"]])
+        df = conn.execute(
+            """
+            SELECT f.content_hash, f.fuzzy_score, f.embedding_similarity,
+                   f.url_depth_score
+            FROM link_features f JOIN wanted USING (content_hash)
+            WHERE f.feature_version = ?
+            """,
+            (feature_version,),
+        ).fetchdf()
+        conn.unregister("wanted")
+    return df
+
+
+def save_link_features(df, feature_version):
+    """
+    Insert or replace features, df has content_hash and the feature columns.
+    """
+    with get_db_connection() as conn:
+        conn.register("new_features", df)
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO link_features
+            SELECT content_hash, ?, fuzzy_score, embedding_similarity,
+                   url_depth_score, current_timestamp
+            FROM new_features
+            """,
+            (feature_version,),
+        )
+        conn.unregister("new_features")
+
+
+def delete_stale_link_features(feature_version):
+    """
+    Drop features computed with other keyword lists or embeddings.
+    """
+    with get_db_connection() as conn:
+        stale = conn.execute(
+            "SELECT count(*) FROM link_features WHERE feature_version != ?",
+            (feature_version,),
+        ).fetchone()[0]
+        if stale:
+            conn.execute(
+                "DELETE FROM link_features WHERE feature_version != ?",
+                (feature_version,),
+            )
+            print(f"Dropped {stale} stale feature store rows.")
+
+
+def _training_query(source):
+    """
+    Query and params reading url, anchor_text, label rows from source.
+    """
+    if source.lower().endswith(".csv"):
+        return "SELECT url, anchor_text, label FROM read_csv_auto(?)", (source,)
+    if source.lower().endswith(".parquet"):
+        return "SELECT url, anchor_text, label FROM read_parquet(?)", (source,)
+    return source, ()
+
+
+def iter_training_chunks(source, chunk_size):
+    """
+    Stream url, anchor_text, label rows in DataFrame chunks of about
+    chunk_size rows. source is a .csv or .parquet path, or a DuckDB query.
+    """
+    query, params = _training_query(source)
+
+    # DuckDB hands results out in vectors of 2048 rows
+    vectors = max(1, chunk_size // 2048)
+    with get_db_connection() as conn:
+        result = conn.execute(query, params)
+        while True:
+            chunk = result.fetch_df_chunk(vectors)
+            if chunk.empty:
+                break
+            yield chunk
+
+
+def get_held_out_links(limit, training_urls=(), training_source=None):
+    """
+    Repeatable sample of stored links that aren't training rows, url and
+    anchor_text. Training rows are given as urls or as a training source.
+    """
+    if training_source is not None:
+        training, params = _training_query(training_source)
+    else:
+        training, params = "SELECT unnest(?::VARCHAR[]) AS url", (list(training_urls),)
+
+    with get_db_connection() as conn:
+        return conn.execute(
+            f"""
+            SELECT url, anchor_text FROM (
+                SELECT url, anchor_text FROM links
+                WHERE anchor_text IS NOT NULL
+                AND url NOT IN (SELECT url FROM ({training}) WHERE url IS NOT NULL)
+            ) USING SAMPLE reservoir({int(limit)} ROWS) REPEATABLE (1)
+            """,
+            params,
+        ).fetchdf()
+
+
 def get_top_links(limit=10, domain=None):
     """
     Fetch top-ranked links, can filter by domain.
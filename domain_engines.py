@@ -0,0 +1,72 @@
+import threading
+
+from database import get_domain_engines, save_domain_engine
+from config import DOMAIN_ENGINE_OVERRIDES
+
+# Ways to fetch a page, cheapest first
+ENGINES = ("http", "chromium", "firefox")
+
+
+class DomainEngines:
+    """
+    Remembers which engine (plain HTTP, Chromium or Firefox) returned links
+    for each domain, persisted in DuckDB. Pinned domains and entries in
+    DOMAIN_ENGINE_OVERRIDES are never relearned.
+    """
+
+    def __init__(self, overrides=DOMAIN_ENGINE_OVERRIDES):
+        self.overrides = {
+            domain.lower(): engine for domain, engine in overrides.items()
+        }
+        self._engines = None  # domain -> (engine, pinned), loaded on first use
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._engines is None:
+                self._engines = get_domain_engines()
+            return self._engines
+
+    def get(self, domain):
+        """
+        Returns (engine, pinned) for domain, engine is None if unknown.
+        """
+        domain = domain.lower()
+        if domain in self.overrides:
+            return self.overrides[domain], True
+        return self._load().get(domain, (None, False))
+
+    def remember(self, domain, engine):
+        """
+        Record the engine that worked for domain, unless it is pinned.
+        """
+        domain = domain.lower()
+        current, pinned = self.get(domain)
+        if pinned or current == engine:
+            return
+        self._load()[domain] = (engine, False)
+        save_domain_engine(domain, engine, False)
+
+    def pin(self, domain, engine):
+        """
+        Always use engine for domain, no fallback and no relearning.
+        engine=None unpins and forgets the domain.
+        """
+        if engine is not None and engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine}")
+        domain = domain.lower()
+        engines = self._load()
+        if engine is None:
+            engines.pop(domain, None)
+        else:
+            engines[domain] = (engine, True)
+        save_domain_engine(domain, engine, engine is not None)
+
+    def all(self):
+        return {
+            domain: {"engine": engine, "pinned": pinned}
+            for domain, (engine, pinned) in list(self._load().items())
+        }
+
+
+domain_engines = DomainEngines()
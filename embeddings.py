@@ -0,0 +1,168 @@
+"""
+Local, memory-mapped store for the GloVe embeddings.
+
+The gensim downloader copy is converted once into KeyedVectors' native format,
+which keeps the vector matrix in a separate .npy file. That file is opened
+memory-mapped and read-only, so every worker process shares one physical copy
+through the OS page cache and nothing is downloaded at load time.
+"""
+
+import glob
+import hashlib
+import os
+import threading
+import numpy as np
+
+from gensim.models import KeyedVectors
+from config import (
+    EMBEDDINGS_NAME,
+    EMBEDDINGS_PATH,
+    PRUNED_EMBEDDINGS_PATH,
+    PRUNED_EMBEDDINGS_DTYPE,
+    EMBEDDINGS_FREQUENT_WORDS,
+    PRIORITY_KEY_WORDS,
+    NON_PRIORITY_KEY_WORDS,
+)
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def build_embedding_store(path=EMBEDDINGS_PATH, name=EMBEDDINGS_NAME):
+    """
+    Download (or read from the gensim cache) and save vectors to path.
+    """
+    import gensim.downloader as api  # Only needed for this one-off build
+
+    print(f"Building embedding store '{path}' from '{name}'...")
+    vectors = api.load(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # sep_limit=0 stores every array as its own .npy so it can be mmapped
+    vectors.save(path, sep_limit=0)
+    print(f"Embedding store saved to {path}")
+
+
+def load_word_vectors(path=None):
+    """
+    Open an embedding store memory-mapped and read-only. Loaded once per process.
+
+    With no path, uses the pruned store saved next to the model if there is
+    one, otherwise the full store (building it first if it doesn't exist yet).
+    """
+    if path is None:
+        path = (
+            PRUNED_EMBEDDINGS_PATH
+            if os.path.exists(PRUNED_EMBEDDINGS_PATH)
+            else EMBEDDINGS_PATH
+        )
+
+    with _lock:
+        if path not in _loaded:
+            if path == EMBEDDINGS_PATH and not os.path.exists(path):
+                build_embedding_store(path)
+            _loaded[path] = KeyedVectors.load(path, mmap="r")
+        return _loaded[path]
+
+
+def embedding_fingerprint(word_vectors):
+    """
+    Short hash identifying an embedding table by its vocabulary, size and dtype.
+    Cheap enough for load time, the vector data itself isn't read.
+    """
+    digest = hashlib.sha1("\n".join(word_vectors.index_to_key).encode("utf-8"))
+    digest.update(f"{word_vectors.vector_size}:{word_vectors.vectors.dtype}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _save_atomic(vectors, path):
+    """
+    Save vectors to temp files and move them over path. Running processes
+    keep their mapping of the old files, rewriting them in place would
+    change the vectors under them.
+    """
+    tmp = path + ".tmp"
+    vectors.save(tmp, sep_limit=0)
+    # The separate .npy arrays, then the pickle
+    for name in sorted(glob.glob(glob.escape(tmp) + ".*")) + [tmp]:
+        os.replace(name, path + name[len(tmp) :])
+    with _lock:
+        _loaded.pop(path, None)  # Later loads in this process see the new table
+
+
+def tokenize(text):
+    """
+    Tokens looked up in the embedding table.
+    """
+    return text.lower().split()
+
+
+def embedding_similarity(word_vectors, text):
+    """
+    Norm of the average word vector of text.
+    Out-of-vocabulary tokens are skipped, a text with no known tokens scores 0.
+    """
+    vectors = [word_vectors[word] for word in tokenize(text) if word in word_vectors]
+    if vectors:
+        # float32 accumulation so a float16 table gives the same precision
+        avg_vector = np.mean(vectors, axis=0, dtype=np.float32)
+        return np.linalg.norm(avg_vector)  # Convert vector to a single value
+    return 0
+
+
+def build_pruned_embeddings(
+    texts,
+    path=PRUNED_EMBEDDINGS_PATH,
+    dtype=PRUNED_EMBEDDINGS_DTYPE,
+    frequent_words=EMBEDDINGS_FREQUENT_WORDS,
+    eval_texts=(),
+    tokens=(),
+):
+    """
+    Save a compact embedding table covering the training vocabulary (the
+    tokens of texts plus tokens), the keyword lists and the
+    `frequent_words` most frequent GloVe words.
+
+    Returns a report with the memory saved and the score drift against the
+    full table on eval_texts. These should be held-out links: every token of
+    texts is kept, so they would always show no drift.
+    """
+    texts = list(texts)
+    full = load_word_vectors(EMBEDDINGS_PATH)
+
+    vocab = set(full.index_to_key[:frequent_words])
+    vocab.update(tokens)
+    for text in texts:
+        vocab.update(tokenize(text))
+    for keyword in PRIORITY_KEY_WORDS + NON_PRIORITY_KEY_WORDS:
+        vocab.update(tokenize(keyword))
+
+    # Keep GloVe's frequency order
+    keep = [word for word in full.index_to_key if word in vocab]
+    pruned = KeyedVectors(full.vector_size, dtype=dtype)
+    pruned.add_vectors(keep, full[keep].astype(dtype))
+    # Saved with the table, lets models trained on the full table accept it
+    pruned.source_fingerprint = embedding_fingerprint(full)
+    _save_atomic(pruned, path)
+
+    drift = np.abs(
+        [
+            embedding_similarity(full, text) - embedding_similarity(pruned, text)
+            for text in list(eval_texts)
+        ]
+    )
+    report = {
+        "words_kept": len(keep),
+        "words_total": len(full.index_to_key),
+        "bytes_full": int(full.vectors.nbytes),
+        "bytes_pruned": int(pruned.vectors.nbytes),
+        "bytes_saved": int(full.vectors.nbytes - pruned.vectors.nbytes),
+        "eval_links": len(drift),
+        "max_drift": float(drift.max()) if len(drift) else 0.0,
+        "mean_drift": float(drift.mean()) if len(drift) else 0.0,
+    }
+    print(f"Pruned embeddings saved to {path}: {report}")
+    return report
+
+
+if __name__ == "__main__":
+    build_embedding_store()
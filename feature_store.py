@@ -0,0 +1,89 @@
+import hashlib
+import json
+import pandas as pd
+
+from embeddings import embedding_fingerprint
+from model_artifact import keyword_hash
+from url_ranking_model import EXTRA_FEATURES, FEATURE_DEFINITION_VERSION
+from database import (
+    get_link_features,
+    save_link_features,
+    delete_stale_link_features,
+)
+from config import EMBEDDINGS_NAME
+
+
+def content_hash(url, anchor_text):
+    """
+    Key of a training row, the features only depend on url and anchor text.
+    """
+    raw = f"{url}\0{anchor_text}".encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+def feature_version(word_vectors):
+    """
+    Hash of everything the extra features are computed from: the keyword
+    lists and multipliers, the feature columns and definitions and the
+    embedding table.
+    """
+    config = {
+        "keywords": keyword_hash(),
+        "features": EXTRA_FEATURES,
+        "definition_version": FEATURE_DEFINITION_VERSION,
+        "embeddings": {
+            "name": EMBEDDINGS_NAME,
+            "fingerprint": embedding_fingerprint(word_vectors),
+            "words": len(word_vectors.index_to_key),
+            "vector_size": int(word_vectors.vector_size),
+            "dtype": str(word_vectors.vectors.dtype),
+        },
+    }
+    raw = json.dumps(config, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+class FeatureStore:
+    """
+    DuckDB store of the fuzzy, embedding and depth features of training rows,
+    keyed by content hash. Entries from another feature version are dropped
+    on open, so a retrain only computes features for new or changed rows.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        delete_stale_link_features(version)
+
+    @classmethod
+    def for_ranker(cls, ranker):
+        return cls(feature_version(ranker.word_vectors))
+
+    def add_features(self, df, compute):
+        """
+        Fill the EXTRA_FEATURES columns of df (url, anchor_text, text),
+        calling compute(rows) only for rows not in the store.
+        """
+        hashes = pd.Series(
+            [content_hash(u, a) for u, a in zip(df["url"], df["anchor_text"])],
+            index=df.index,
+        )
+        wanted = pd.DataFrame({"content_hash": hashes.unique()})
+        stored = get_link_features(wanted, self.version)
+        stored = stored.set_index("content_hash")[EXTRA_FEATURES]
+
+        missing = ~hashes.isin(stored.index)
+        if missing.any():
+            rows = df.loc[missing, ["url", "anchor_text", "text"]].copy()
+            rows["content_hash"] = hashes[missing]
+            rows = rows.drop_duplicates(subset="content_hash")
+            compute(rows)
+            save_link_features(rows[["content_hash"] + EXTRA_FEATURES], self.version)
+            computed = rows.set_index("content_hash")[EXTRA_FEATURES]
+            stored = pd.concat([stored, computed])
+
+        print(
+            f"Feature store: reused features for {int((~missing).sum())} rows, "
+            f"computed {int(missing.sum())}"
+        )
+
+        df[EXTRA_FEATURES] = stored.loc[hashes].to_numpy()
@@ -0,0 +1,40 @@
+"""
+Fold pending relevance labels from the link_feedback table into the
+latest model, e.g. from cron when the app runs as several processes.
+"""
+
+import threading
+
+from url_ranking_model import UrlRanker
+from model_artifact import artifact_lock
+from database import init_db, get_feedback, mark_feedback_applied
+
+_lock = threading.Lock()
+
+
+def apply_pending_feedback(ranker):
+    """
+    Update ranker with every pending label and mark them applied.
+    Returns the new model version, None if nothing was pending.
+    """
+    with _lock, artifact_lock(ranker.artifact_dir):
+        # Start from the newest published model, not this process's copy
+        ranker.refresh()
+        pending = get_feedback(pending_only=True)
+        if pending.empty:
+            return None
+
+        version = ranker.partial_fit(
+            pending["url"].tolist(),
+            pending["anchor_text"].tolist(),
+            pending["label"].tolist(),
+        )
+        mark_feedback_applied(pending["row_id"].tolist(), version)
+
+    print(f"Applied {len(pending)} feedback labels, model version {version}")
+    return version
+
+
+if __name__ == "__main__":
+    init_db()
+    apply_pending_feedback(UrlRanker())
@@ -0,0 +1,122 @@
+import http.client
+import re
+
+from html.parser import HTMLParser
+from urllib.request import Request, urlopen
+from config import HTTP_FETCH_TIMEOUT, HTTP_FETCH_MAX_BYTES, HTTP_USER_AGENT
+
+# Markers of an empty client-side app shell that only fills in with JavaScript
+JS_SHELL_PATTERNS = [
+    re.compile(
+        r"<div[^>]+id=[\"'](root|app|__next|___gatsby)[\"'][^>]*>\s*</div>", re.I
+    ),
+    re.compile(r"<noscript[^>]*>[^<]*enable javascript", re.I),
+    re.compile(r"<app-root[^>]*>\s*</app-root>", re.I),
+]
+
+# Pages with fewer anchors than this that also match a shell marker get escalated
+JS_SHELL_MIN_ANCHORS = 5
+
+
+class LinkParser(HTMLParser):
+    """
+    Collect <a> tags from static HTML into the same records the browser returns.
+    """
+
+    def __init__(self, extra_fields=()):
+        super().__init__(convert_charrefs=True)
+        self.extra_fields = extra_fields
+        self.records = []
+        self._current = None
+        self._text = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "template"):
+            self._skip_depth += 1
+        elif tag == "a":
+            attrs = dict(attrs)
+            self._current = attrs
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "template"):
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "a" and self._current is not None:
+            href = self._current.get("href")
+            text = " ".join("".join(self._text).split())
+            if href and text:
+                record = {"href": href, "text": text}
+                for field in self.extra_fields:
+                    record[field] = self._current.get(field)
+                self.records.append(record)
+            self._current = None
+
+    def handle_data(self, data):
+        if self._current is not None and not self._skip_depth:
+            self._text.append(data)
+
+
+def fetch_html(url, timeout=HTTP_FETCH_TIMEOUT, validators=None):
+    """
+    Plain HTTP GET. Returns the decoded HTML, or None for errors and non-HTML responses.
+    The response's ETag and Last-Modified are stored in the validators dict if given.
+    """
+    req = Request(url, headers={"User-Agent": HTTP_USER_AGENT})
+    try:
+        with urlopen(req, timeout=timeout) as response:
+            if validators is not None:
+                validators["etag"] = response.headers.get("ETag")
+                validators["last_modified"] = response.headers.get("Last-Modified")
+            content_type = response.headers.get_content_type()
+            if content_type not in ("text/html", "application/xhtml+xml"):
+                return None
+            charset = response.headers.get_content_charset() or "utf-8"
+            body = response.read(HTTP_FETCH_MAX_BYTES)
+            # A capped read() returns short instead of raising on a dropped body
+            length = response.headers.get("Content-Length")
+            if length and len(body) < min(int(length), HTTP_FETCH_MAX_BYTES):
+                raise http.client.IncompleteRead(body, int(length) - len(body))
+    except (OSError, http.client.HTTPException, ValueError) as e:
+        # OSError covers URLError, timeouts and connection resets mid-read
+        print(f"HTTP fetch failed for {url}: {e}")
+        return None
+
+    return body.decode(charset, errors="replace")
+
+
+def parse_link_records(html, extra_fields=()):
+    """
+    Parse link records out of an HTML document.
+    """
+    parser = LinkParser(extra_fields)
+    parser.feed(html)
+    parser.close()
+    return parser.records
+
+
+def looks_js_rendered(html, records):
+    """
+    Guess whether the static HTML is an app shell that needs a real browser.
+    """
+    if not records:
+        return True
+    if len(records) < JS_SHELL_MIN_ANCHORS:
+        return any(pattern.search(html) for pattern in JS_SHELL_PATTERNS)
+    return False
+
+
+def fetch_link_records(url, extra_fields=(), validators=None):
+    """
+    Fetch a page over plain HTTP and parse its links.
+    Returns None when the page needs a browser (fetch failed or looks JS-rendered).
+    """
+    html = fetch_html(url, validators=validators)
+    if html is None:
+        return None
+
+    records = parse_link_records(html, extra_fields)
+    if looks_js_rendered(html, records):
+        return None
+
+    return records
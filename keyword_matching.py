@@ -0,0 +1,81 @@
+import re
+import numpy as np
+
+from fuzzywuzzy import fuzz
+from config import (
+    PRIORITY_KEY_WORDS,
+    NON_PRIORITY_KEY_WORDS,
+    PRIORITY_MULTIPLIER,
+    NON_PRIORITY_MULTIPLIER,
+)
+
+
+class FuzzyKeywordScorer:
+    """
+    Fuzzy keyword feature for a whole batch of texts. Uses fuzzywuzzy's
+    partial_ratio so scores match what the models were trained on, but
+    scores each distinct text only once per batch.
+    """
+
+    def __init__(
+        self,
+        priority_keywords=PRIORITY_KEY_WORDS,
+        non_priority_keywords=NON_PRIORITY_KEY_WORDS,
+    ):
+        self.priority_keywords = list(priority_keywords)
+        self.non_priority_keywords = list(non_priority_keywords)
+
+    def max_scores(self, texts, keywords):
+        """
+        Best partial_ratio of each lowercased text against any keyword.
+        """
+        lowered = [text.lower() for text in texts]
+        if not lowered:
+            return np.zeros(0, dtype=np.int64)
+
+        # Nav and footer links repeat a lot, only score each text once
+        unique, inverse = np.unique(lowered, return_inverse=True)
+        best = np.array(
+            [
+                max(fuzz.partial_ratio(text, keyword) for keyword in keywords)
+                for text in unique.tolist()
+            ],
+            dtype=np.int64,
+        )
+        return best[inverse]
+
+    def score(self, texts):
+        """
+        Priority keyword match boosted by PRIORITY_MULTIPLIER, minus the
+        non-priority match penalized by NON_PRIORITY_MULTIPLIER.
+        """
+        texts = list(texts)
+        positive = self.max_scores(texts, self.priority_keywords)
+        negative = self.max_scores(texts, self.non_priority_keywords)
+        return positive * PRIORITY_MULTIPLIER - negative * NON_PRIORITY_MULTIPLIER
+
+
+class KeywordAutomaton:
+    """
+    Multi-pattern substring matcher compiled once from a keyword list.
+
+    All keywords go into a single regex alternation, so checking a URL segment
+    is one scan in the C regex engine instead of a Python `in` per keyword.
+    The text is lowercased, keywords are matched as written, like
+    `keyword in text.lower()`.
+    """
+
+    def __init__(self, keywords):
+        # Deduped, longest first for a stable pattern
+        patterns = sorted(set(keywords), key=lambda p: (-len(p), p))
+        self.pattern = (
+            re.compile("|".join(re.escape(p) for p in patterns)) if patterns else None
+        )
+
+    def matches(self, text):
+        """
+        True if any keyword occurs in text.
+        """
+        if self.pattern is None:
+            return False
+        return self.pattern.search(text.lower()) is not None
@@ -0,0 +1,101 @@
+import numpy as np
+
+from scipy import sparse
+from scipy.special import expit
+from config import FEEDBACK_LEARNING_RATE, FEEDBACK_EPOCHS, FEEDBACK_L2
+
+
+class LinearScorer:
+    """
+    Plain NumPy version of the StandardScaler + LogisticRegression pipeline.
+
+    Inference is just an affine transform and a sigmoid, so the scaler is
+    folded into the LR weights:
+        (x - mean) / scale . w + b == x . (w / scale) + (b - mean / scale . w)
+    Works on dense and sparse feature matrices.
+
+    scale is the folded scaler's scale_, kept so partial_fit can take its
+    steps in the standardized space the model was trained in.
+    """
+
+    def __init__(self, weights, bias, model_version=None, scale=None):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.model_version = model_version
+        self.scale = (
+            np.ones_like(self.weights)
+            if scale is None
+            else np.asarray(scale, dtype=np.float64)
+        )
+
+    @classmethod
+    def from_pipeline(cls, pipeline, model_version=None):
+        """
+        Fold a fitted make_pipeline(StandardScaler(), LogisticRegression()).
+        """
+        scaler, classifier = pipeline[0], pipeline[-1]
+        weights = classifier.coef_[0]
+        bias = classifier.intercept_[0]
+        scale = None
+
+        if getattr(scaler, "with_std", False):
+            scale = scaler.scale_
+            weights = weights / scale
+        if getattr(scaler, "with_mean", False):
+            bias = bias - np.dot(scaler.mean_, weights)
+
+        return cls(weights, bias, model_version, scale)
+
+    def decision_function(self, X):
+        return np.asarray(X @ self.weights).ravel() + self.bias
+
+    def predict_proba(self, X):
+        """
+        Probability of the positive class for each row of X.
+        """
+        return expit(self.decision_function(X))
+
+    def check_equivalence(self, pipeline, X, atol=1e-9):
+        """
+        Raise ValueError if this scorer disagrees with pipeline.predict_proba on X.
+        Returns the largest absolute difference.
+        """
+        if getattr(pipeline[0], "with_mean", False):
+            X = X.toarray() if hasattr(X, "toarray") else X  # Centering needs dense
+        expected = pipeline.predict_proba(X)[:, 1]
+        diff = float(np.max(np.abs(self.predict_proba(X) - expected), initial=0.0))
+        if diff > atol:
+            raise ValueError(
+                f"Folded scorer differs from predict_proba by {diff:.3g} (atol {atol})"
+            )
+        return diff
+
+    def partial_fit(
+        self,
+        X,
+        y,
+        learning_rate=FEEDBACK_LEARNING_RATE,
+        epochs=FEEDBACK_EPOCHS,
+        l2=FEEDBACK_L2,
+    ):
+        """
+        Gradient descent on the log loss of labeled rows, starting from the
+        current weights. The L2 term pulls toward the current weights rather
+        than zero, so a small (even single-class) batch nudges the model
+        instead of replacing it. Returns a new LinearScorer.
+        """
+        y = np.asarray(y, dtype=np.float64)
+        if sparse.issparse(X):
+            Z = sparse.csr_matrix(X.multiply(1.0 / self.scale))
+        else:
+            Z = np.asarray(X) / self.scale
+
+        start = self.weights * self.scale
+        weights, bias = start.copy(), self.bias
+        for _ in range(epochs):
+            error = expit(np.asarray(Z @ weights).ravel() + bias) - y
+            gradient = np.asarray(Z.T @ error).ravel() / len(y)
+            weights -= learning_rate * (gradient + l2 * (weights - start))
+            bias -= learning_rate * error.mean()
+
+        return LinearScorer(weights / self.scale, bias, scale=self.scale)
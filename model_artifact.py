@@ -0,0 +1,224 @@
+"""
+Versioned model artifact: one directory per model version holding
+- manifest.json: format version, feature config, keyword hash, embedding reference
+- vocabulary.json: TF-IDF terms in column order (TF-IDF models only)
+- idf.npy (TF-IDF models only), weights.npy, scale.npy: memory-mappable arrays
+plus a LATEST file naming the version to load. Nothing is unpickled.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import time
+import numpy as np
+
+from contextlib import contextmanager
+from functools import cached_property
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from embeddings import embedding_fingerprint
+from linear_scorer import LinearScorer
+from config import (
+    MODEL_ARTIFACT_DIR,
+    PRIORITY_KEY_WORDS,
+    NON_PRIORITY_KEY_WORDS,
+    PRIORITY_MULTIPLIER,
+    NON_PRIORITY_MULTIPLIER,
+    EMBEDDINGS_NAME,
+)
+
+FORMAT_VERSION = 1
+
+
+def keyword_hash():
+    """
+    Hash of the keyword lists and multipliers the features are built from.
+    """
+    config = {
+        "priority": PRIORITY_KEY_WORDS,
+        "non_priority": NON_PRIORITY_KEY_WORDS,
+        "priority_multiplier": PRIORITY_MULTIPLIER,
+        "non_priority_multiplier": NON_PRIORITY_MULTIPLIER,
+    }
+    raw = json.dumps(config, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def save_artifact(
+    vectorizer,
+    scorer,
+    extra_features,
+    definition_version,
+    word_vectors,
+    artifact_dir=MODEL_ARTIFACT_DIR,
+    parent_version=None,
+):
+    """
+    Write a new artifact version and point LATEST at it. Returns its path.
+    parent_version is the model an online update started from.
+    """
+    version = scorer.model_version
+    path = os.path.join(artifact_dir, version)
+    os.makedirs(path, exist_ok=True)
+
+    feature_config = {
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": vectorizer.stop_words,
+        "extra_features": list(extra_features),
+        "definition_version": definition_version,
+    }
+    if isinstance(vectorizer, HashingVectorizer):
+        # Stateless, the config is all there is to store
+        feature_config["text_featurizer"] = "hashing"
+        feature_config["n_features"] = vectorizer.n_features
+        feature_config["alternate_sign"] = vectorizer.alternate_sign
+        feature_config["norm"] = vectorizer.norm
+        files = []
+    else:
+        feature_config["text_featurizer"] = "tfidf"
+        feature_config["max_features"] = vectorizer.max_features
+        terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        with open(os.path.join(path, "vocabulary.json"), "w") as f:
+            json.dump(terms, f)
+        np.save(os.path.join(path, "idf.npy"), np.asarray(vectorizer.idf_))
+        files = ["vocabulary.json", "idf.npy"]
+
+    np.save(os.path.join(path, "weights.npy"), scorer.weights)
+    np.save(os.path.join(path, "scale.npy"), scorer.scale)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model_version": version,
+        "parent_version": parent_version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "feature_config": feature_config,
+        "keyword_hash": keyword_hash(),
+        "embeddings": {
+            "name": EMBEDDINGS_NAME,
+            "fingerprint": embedding_fingerprint(word_vectors),
+            "words": len(word_vectors.index_to_key),
+            "vector_size": int(word_vectors.vector_size),
+            "dtype": str(word_vectors.vectors.dtype),
+        },
+        "bias": scorer.bias,
+        "files": files + ["weights.npy", "scale.npy"],
+    }
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Publish atomically so readers never see a half-written version
+    latest = os.path.join(artifact_dir, "LATEST")
+    with open(latest + ".tmp", "w") as f:
+        f.write(version)
+    os.replace(latest + ".tmp", latest)
+
+    print(f"Model artifact saved to {path}")
+    return path
+
+
+def latest_version(artifact_dir=MODEL_ARTIFACT_DIR):
+    """
+    Version named in LATEST, None if no artifact has been published.
+    """
+    try:
+        with open(os.path.join(artifact_dir, "LATEST")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def artifact_lock(artifact_dir=MODEL_ARTIFACT_DIR):
+    """
+    Exclusive lock across processes, held while an update reads LATEST,
+    fits and publishes, so concurrent updates don't drop each other.
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    with open(os.path.join(artifact_dir, ".lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class ModelArtifact:
+    """
+    A loaded artifact version. Only the manifest is read up front, the
+    vectorizer and scorer are built on first use from memory-mapped arrays.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+
+        if self.manifest["format_version"] != FORMAT_VERSION:
+            raise ValueError(
+                f"Model artifact '{path}' has format version "
+                f"{self.manifest['format_version']}, expected {FORMAT_VERSION}"
+            )
+        if self.manifest["keyword_hash"] != keyword_hash():
+            raise ValueError(
+                f"Model artifact '{path}' was trained with different keyword lists "
+                "or multipliers than config.py. Retrain the model or restore the "
+                "keywords it was trained with."
+            )
+
+    @classmethod
+    def load_latest(cls, artifact_dir=MODEL_ARTIFACT_DIR):
+        version = latest_version(artifact_dir)
+        if version is None:
+            raise FileNotFoundError(f"No model artifact in '{artifact_dir}'")
+        return cls(os.path.join(artifact_dir, version))
+
+    @property
+    def model_version(self):
+        return self.manifest["model_version"]
+
+    @property
+    def extra_features(self):
+        return self.manifest["feature_config"]["extra_features"]
+
+    @property
+    def embeddings_fingerprint(self):
+        return self.manifest["embeddings"].get("fingerprint")
+
+    @property
+    def feature_definition_version(self):
+        return self.manifest["feature_config"].get("definition_version", 1)
+
+    def _array(self, name):
+        return np.load(os.path.join(self.path, name), mmap_mode="r")
+
+    @cached_property
+    def vectorizer(self):
+        config = self.manifest["feature_config"]
+        if config.get("text_featurizer", "tfidf") == "hashing":
+            return HashingVectorizer(
+                ngram_range=tuple(config["ngram_range"]),
+                stop_words=config["stop_words"],
+                n_features=config["n_features"],
+                alternate_sign=config["alternate_sign"],
+                norm=config["norm"],
+            )
+
+        vectorizer = TfidfVectorizer(
+            ngram_range=tuple(config["ngram_range"]),
+            stop_words=config["stop_words"],
+            max_features=config["max_features"],
+        )
+        with open(os.path.join(self.path, "vocabulary.json")) as f:
+            terms = json.load(f)
+        vectorizer.vocabulary_ = {term: i for i, term in enumerate(terms)}
+        vectorizer.idf_ = self._array("idf.npy")
+        return vectorizer
+
+    @cached_property
+    def scorer(self):
+        return LinearScorer(
+            self._array("weights.npy"),
+            self.manifest["bias"],
+            self.model_version,
+            self._array("scale.npy"),
+        )
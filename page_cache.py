@@ -0,0 +1,128 @@
+import hashlib
+import json
+import pandas as pd
+
+import http.client
+
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from database import (
+    get_cached_page,
+    save_cached_page,
+    update_cached_page_validators,
+)
+from scraper import normalize_url
+from config import HTTP_FETCH_TIMEOUT, HTTP_USER_AGENT
+
+
+def link_set_hash(links):
+    """
+    Order-independent hash of a page's (href, anchor_text) pairs.
+    """
+    lines = sorted({f"{href}\t{text}" for href, text in links})
+    return hashlib.sha1("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def cache_key(url):
+    """
+    Normalized URL used as the cache key.
+    """
+    return normalize_url(url, url)
+
+
+def conditional_head(url, etag=None, last_modified=None):
+    """
+    Conditional HEAD request. True if the server answered 304 Not Modified.
+    """
+    headers = {"User-Agent": HTTP_USER_AGENT}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    req = Request(url, headers=headers, method="HEAD")
+    try:
+        with urlopen(req, timeout=HTTP_FETCH_TIMEOUT):
+            return False
+    except HTTPError as e:
+        return e.code == 304
+    except (OSError, http.client.HTTPException, ValueError):
+        return False
+
+
+class PageCache:
+    """
+    On-disk cache of crawled pages keyed by normalized URL.
+
+    Stores the ETag/Last-Modified of the page's GET response, a hash of its
+    extracted link set and the ranked links, so unchanged pages skip
+    rendering, ranking and DB writes.
+    """
+
+    def __init__(self):
+        self._validators = {}  # url -> (etag, last_modified) seen this crawl
+        self.stats = {"not_modified": 0, "same_links": 0, "changed": 0}
+
+    def is_unchanged(self, url, entry=None):
+        """
+        Revalidate a cached url with the server. True if it answered 304.
+        Pages that aren't cached return False without a request.
+        """
+        entry = entry or get_cached_page(cache_key(url))
+        if entry is None or not (entry["etag"] or entry["last_modified"]):
+            return False
+
+        if conditional_head(url, entry["etag"], entry["last_modified"]):
+            self.stats["not_modified"] += 1
+            return True
+        return False
+
+    def set_validators(self, url, validators):
+        """
+        Remember the ETag/Last-Modified of url's GET response for put().
+        """
+        self._validators[url] = (
+            validators.get("etag"),
+            validators.get("last_modified"),
+        )
+
+    def get(self, url):
+        return get_cached_page(cache_key(url))
+
+    def cached_ranking(self, entry, model_version):
+        """
+        Ranked links stored for entry, None if they were scored by another model.
+        """
+        if entry["model_version"] != model_version:
+            return None
+        return pd.DataFrame(json.loads(entry["ranked"]))
+
+    def lookup_links(self, url, links, model_version):
+        """
+        Cached ranking for url if its link set is the same as last crawl.
+        A hit keeps the entry, so the new GET's validators are stored here.
+        """
+        entry = get_cached_page(cache_key(url))
+        if not entry or entry["links_hash"] != link_set_hash(links):
+            self.stats["changed"] += 1
+            return None
+
+        ranked_df = self.cached_ranking(entry, model_version)
+        if ranked_df is not None:
+            self.stats["same_links"] += 1
+            validators = self._validators.get(url)
+            if validators and validators != (entry["etag"], entry["last_modified"]):
+                update_cached_page_validators(cache_key(url), *validators)
+        return ranked_df
+
+    def put(self, url, links, ranked_df, model_version):
+        etag, last_modified = self._validators.get(url, (None, None))
+        save_cached_page(
+            cache_key(url),
+            etag,
+            last_modified,
+            link_set_hash(links),
+            json.dumps(list(links)),
+            ranked_df[["url", "score", "anchor_text"]].to_json(orient="records"),
+            model_version,
+        )
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from contextlib import contextmanager
+
+
+class RankerStats:
+    """
+    Per-stage wall time and row counts for UrlRanker calls.
+
+    Stages are cache_lookup, tfidf, fuzzy, embedding, depth and predict.
+    Hooks are called as hook(stage, seconds, rows) after every timed stage,
+    e.g. to forward timings to a metrics backend.
+    """
+
+    def __init__(self):
+        self.hooks = []
+        self._stages = {}  # stage -> totals
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    @contextmanager
+    def stage(self, name, rows):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, rows)
+
+    def record(self, name, seconds, rows):
+        with self._lock:
+            totals = self._stages.setdefault(
+                name, {"calls": 0, "rows": 0, "seconds": 0.0, "max_seconds": 0.0}
+            )
+            totals["calls"] += 1
+            totals["rows"] += rows
+            totals["seconds"] += seconds
+            totals["max_seconds"] = max(totals["max_seconds"], seconds)
+            totals["last_seconds"] = seconds
+            totals["last_rows"] = rows
+
+        for hook in self.hooks:
+            hook(name, seconds, rows)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def stats(self):
+        """
+        Totals per stage, with mean time per call and per 1k rows.
+        """
+        with self._lock:
+            stages = {name: dict(totals) for name, totals in self._stages.items()}
+        for totals in stages.values():
+            totals["mean_seconds"] = totals["seconds"] / totals["calls"]
+            totals["seconds_per_1k_rows"] = (
+                totals["seconds"] / totals["rows"] * 1000 if totals["rows"] else 0.0
+            )
+        return stages
@@ -0,0 +1,31 @@
+"""
+Re-score every stored link with the current model, e.g. after a retrain.
+"""
+
+import argparse
+
+from url_ranking_model import UrlRanker
+from database import init_db, get_links_for_rescoring, update_link_scores
+from config import PARALLEL_CHUNK_SIZE
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Processes, defaults to all cores"
+    )
+    parser.add_argument("--chunk-size", type=int, default=PARALLEL_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    init_db()
+    ranker = UrlRanker()
+
+    links = get_links_for_rescoring()
+    print(f"Re-scoring {len(links)} links...")
+
+    links["score"] = ranker.rank_urls_parallel(
+        links["url"].tolist(),
+        links["anchor_text"].tolist(),
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    update_link_scores(links)
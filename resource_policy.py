@@ -0,0 +1,83 @@
+from urllib.parse import urlparse
+from playwright.async_api import Error
+from url_utils import same_site
+from config import (
+    BLOCKED_RESOURCE_TYPES,
+    BLOCKED_DOMAINS,
+    ALLOWED_THIRD_PARTY_DOMAINS,
+    BLOCK_THIRD_PARTY_REQUESTS,
+)
+
+
+def _matches(host, domains):
+    host = host.lower()
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class ResourcePolicy:
+    """
+    Decide which requests a scraped page may make. We only need the anchors,
+    so images, fonts, media, stylesheets, trackers and (optionally) anything
+    third-party are aborted before they are downloaded.
+    """
+
+    def __init__(
+        self,
+        blocked_types=BLOCKED_RESOURCE_TYPES,
+        blocked_domains=BLOCKED_DOMAINS,
+        allowed_domains=ALLOWED_THIRD_PARTY_DOMAINS,
+        block_third_party=BLOCK_THIRD_PARTY_REQUESTS,
+    ):
+        self.blocked_types = set(blocked_types)
+        self.blocked_domains = list(blocked_domains)
+        self.allowed_domains = list(allowed_domains)
+        self.block_third_party = block_third_party
+        self.stats = {"allowed": 0, "blocked": 0}
+
+    def should_block(self, request_url, resource_type, page_url):
+        """
+        True if a request made while loading page_url should be aborted.
+        """
+        host = urlparse(request_url).hostname or ""
+
+        if request_url == page_url or resource_type == "document":
+            # The page itself and its redirects must load, only drop
+            # deny-listed frames like embedded video players
+            return request_url != page_url and _matches(host, self.blocked_domains)
+
+        if resource_type in self.blocked_types:
+            return True
+
+        if not host:
+            return False  # data: and blob: URLs
+        if _matches(host, self.blocked_domains):
+            return True
+
+        page_host = urlparse(page_url).hostname or ""
+        third_party = not same_site(host, page_host)
+        if third_party and self.block_third_party:
+            return not _matches(host, self.allowed_domains)
+
+        return False
+
+    def route_handler(self, page_url):
+        """
+        Build a Playwright route handler that applies this policy for page_url.
+        """
+
+        async def handle(route):
+            request = route.request
+            try:
+                if self.should_block(request.url, request.resource_type, page_url):
+                    self.stats["blocked"] += 1
+                    await route.abort()
+                else:
+                    self.stats["allowed"] += 1
+                    await route.continue_()
+            except Error:
+                pass  # Page closed while the request was in flight
+
+        return handle
+
+
+default_policy = ResourcePolicy()
@@ -0,0 +1,133 @@
+import asyncio
+import http.client
+import time
+
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+from urllib.robotparser import RobotFileParser
+from config import (
+    HOST_MAX_IN_FLIGHT,
+    HOST_REQUESTS_PER_SECOND,
+    MAX_CRAWL_DELAY,
+    HTTP_FETCH_TIMEOUT,
+    HTTP_USER_AGENT,
+)
+
+
+def fetch_crawl_delay(url, user_agent=HTTP_USER_AGENT):
+    """
+    Read Crawl-delay for user_agent from the site's robots.txt, 0 if none
+    or if it can't be read.
+    """
+    parsed = urlparse(url)
+    robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+    req = Request(robots_url, headers={"User-Agent": user_agent})
+    try:
+        with urlopen(req, timeout=HTTP_FETCH_TIMEOUT) as response:
+            lines = response.read().decode("utf-8", errors="replace").splitlines()
+    except (OSError, http.client.HTTPException, ValueError):
+        return 0.0
+
+    parser = RobotFileParser()
+    parser.parse(lines)
+    return float(parser.crawl_delay(user_agent) or 0)
+
+
+class HostState:
+    """
+    Per-host politeness bookkeeping.
+    """
+
+    def __init__(self, max_in_flight):
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.lock = asyncio.Lock()
+        self.waiting = 0
+        self.in_flight = 0
+        self.fetched = 0
+        self.next_allowed = 0.0
+        self.delay = None  # Seconds between requests, resolved on first use
+
+
+class PolitenessScheduler:
+    """
+    Caps in-flight requests and request rate per host and honours robots.txt
+    Crawl-delay. Requests waiting on a busy host don't hold a global slot, so
+    one slow site doesn't starve the others.
+    """
+
+    def __init__(
+        self,
+        max_in_flight_per_host=HOST_MAX_IN_FLIGHT,
+        requests_per_second=HOST_REQUESTS_PER_SECOND,
+        max_crawl_delay=MAX_CRAWL_DELAY,
+    ):
+        self.max_in_flight_per_host = max_in_flight_per_host
+        self.min_interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self.max_crawl_delay = max_crawl_delay
+        self._hosts = {}
+
+    async def _resolve_delay(self, url):
+        crawl_delay = await asyncio.to_thread(fetch_crawl_delay, url)
+        return max(self.min_interval, min(crawl_delay, self.max_crawl_delay))
+
+    @asynccontextmanager
+    async def slot(self, url, gate=None):
+        """
+        Wait until url's host may be requested again, then hold a host slot.
+        gate is an optional global asyncio.Semaphore, acquired last so the
+        rate is stamped when the request can actually go out.
+        """
+        host = urlparse(url).netloc.lower()
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(self.max_in_flight_per_host)
+
+        state.waiting += 1
+        try:
+            await state.slots.acquire()
+        finally:
+            state.waiting -= 1
+
+        try:
+            async with state.lock:
+                if state.delay is None:
+                    state.delay = await self._resolve_delay(url)
+                wait = state.next_allowed - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                if gate is not None:
+                    # Still holding the host lock, so the next request to this
+                    # host can't be stamped before this one is sent
+                    await gate.acquire()
+                state.next_allowed = time.monotonic() + state.delay
+
+            try:
+                state.in_flight += 1
+                try:
+                    yield
+                finally:
+                    state.in_flight -= 1
+                    state.fetched += 1
+            finally:
+                if gate is not None:
+                    gate.release()
+        finally:
+            state.slots.release()
+
+    def queue_depths(self):
+        """
+        Waiting and in-flight requests per host.
+        """
+        return {
+            host: {
+                "waiting": state.waiting,
+                "in_flight": state.in_flight,
+                "fetched": state.fetched,
+                "delay": state.delay,
+            }
+            for host, state in list(self._hosts.items())
+        }
+
+
+default_scheduler = PolitenessScheduler()
@@ -0,0 +1,58 @@
+import threading
+import time
+
+from collections import OrderedDict
+from config import SCORE_CACHE_SIZE, SCORE_CACHE_TTL
+
+
+class ScoreCache:
+    """
+    Bounded LRU cache of link scores with an optional TTL (seconds).
+    Keys are (normalized url, anchor_text, model version).
+    """
+
+    def __init__(self, maxsize=SCORE_CACHE_SIZE, ttl=SCORE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (score, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Cached score for key, None on a miss or an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None:
+                if time.monotonic() - entry[1] > self.ttl:
+                    del self._entries[key]
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, score):
+        with self._lock:
+            self._entries[key] = (score, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -1,7 +1,18 @@
-import re
+import asyncio
 
-from playwright.sync_api import sync_playwright, TimeoutError, Error
-from urllib.parse import urljoin
+from browser_pool import get_browser_pool
+from config import (
+    DEEP_SCRAPE_CONCURRENCY,
+    DEEP_SCRAPE_DEADLINE,
+    FETCH_MODE,
+)
+from domain_engines import ENGINES, domain_engines
+from http_fetcher import fetch_link_records
+from resource_policy import default_policy
+from scheduler import default_scheduler
+from playwright.async_api import TimeoutError, Error
+from url_utils import canonicalize_url
+from urllib.parse import urljoin, urlparse
 
 
 def is_valid_url(link):
@@ -24,67 +35,198 @@ def normalize_url(link, base_url):
     """
     Cleans and normalizes URLs by:
     - Resolving relative URLs correctly.
-    - Removing duplicate path segments.
-    - Fixing double slashes.
+    - Canonicalizing the result (see canonicalize_url).
     """
     # Convert relative URLs to absolute
-    normalized = urljoin(base_url, link)
+    return canonicalize_url(urljoin(base_url, link))
 
-    # Remove duplicate slashes (except after "http://")
-    normalized = re.sub(r"(?<!:)//+", "/", normalized)
 
-    # Remove trailing slash (optional, unless needed)
-    normalized = normalized.rstrip("/")
+# Runs inside the page so every anchor comes back in a single round trip
+EXTRACT_LINKS_JS = """
+(anchors, fields) => {
+    const records = [];
+    for (const anchor of anchors) {
+        const href = anchor.getAttribute("href");
+        const text = (anchor.innerText || "").trim();
+        if (!href || !text) continue;
+        const record = {href: href, text: text};
+        for (const field of fields) record[field] = anchor.getAttribute(field);
+        records.push(record);
+    }
+    return records;
+}
+"""
 
-    return normalized
 
-
-def scrape_links(url):
+async def extract_link_records(page, extra_fields=()):
     """
-    Scrape links and anchor text from a given URL using Playwright.
+    Extract every <a> with an href and visible text in one in-page evaluation.
+    Each record has "href", "text" and one key per requested extra attribute.
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+    return await page.eval_on_selector_all("a", EXTRACT_LINKS_JS, list(extra_fields))
 
+
+async def _load_links(url, engine, extra_fields=(), validators=None):
+    """
+    Load a page with a pooled browser and extract link records.
+    Returns None if the page could not be loaded.
+    """
+    handler = default_policy.route_handler(url)
+    async with get_browser_pool().page(engine, route_handler=handler) as page:
         try:
-            page.goto(url, timeout=10000)  # 10-second timeout
-        except TimeoutError or Error:
+            response = await page.goto(url, timeout=10000)  # 10-second timeout
+        except (TimeoutError, Error):
             print(f"Timeout occurred for {url}, skipping...")
-            browser.close()
+            return None
+
+        if response is not None and validators is not None:
+            validators["etag"] = response.headers.get("etag")
+            validators["last_modified"] = response.headers.get("last-modified")
+
+        return await extract_link_records(page, extra_fields)
+
+
+async def _fetch_with_engine(url, engine, extra_fields, validators=None):
+    """
+    Fetch link records with one engine.
+    Returns None if the page could not be loaded, [] if it had no links.
+    """
+    if engine == "http":
+        records = await asyncio.to_thread(
+            fetch_link_records, url, extra_fields, validators
+        )
+        # Unusable static HTML counts as "no links" so the browser gets a turn
+        return [] if records is None else records
+    return await _load_links(url, engine, extra_fields, validators)
+
+
+async def scrape_link_records_async(
+    url, extra_fields=(), fetch_mode=FETCH_MODE, validators=None
+):
+    """
+    Scrape link records from a given URL.
+    The ETag and Last-Modified of the response are stored in validators if given.
+
+    fetch_mode "http" only uses a plain HTTP fetch, "browser" only uses
+    Playwright, and "auto" tries the cheapest engine first: HTTP, then
+    Chromium, then Firefox. The engine that returns links is remembered per
+    domain and tried first next time, pinned domains only use their engine.
+    """
+    domain = urlparse(url).netloc.lower()
+    engines = [
+        engine
+        for engine in ENGINES
+        if fetch_mode == "auto" or (engine == "http") == (fetch_mode == "http")
+    ]
+
+    known, pinned = domain_engines.get(domain)
+    if pinned:
+        engines = [known]
+    elif known in engines:
+        engines.remove(known)
+        engines.insert(0, known)
+
+    for engine in engines:
+        records = await _fetch_with_engine(url, engine, extra_fields, validators)
+        if records is None:
             return []  # Return empty list to avoid breaking the loop
+        if records:
+            if not pinned and engine != known:
+                await asyncio.to_thread(domain_engines.remember, domain, engine)
+            return records
+        print(f"No links found for {url} with {engine}")
+
+    return []
+
 
-        # Extract all <a> tags with href attributes
-        links = page.query_selector_all("a")
+async def scrape_links_async(url, validators=None):
+    """
+    Scrape (href, anchor text) pairs from a given URL.
+    """
+    records = await scrape_link_records_async(url, validators=validators)
+    return [(record["href"], record["text"]) for record in records]
 
-        # Could have flag to enable better swapping here
-        if not links:  # If no links found, try Firefox
-            print("No links found with Chromium. Trying Firefox...")
 
-            browser.close()  # Close the Chromium browser
+def scrape_links(url):
+    """
+    Scrape links and anchor text from a given URL using Playwright.
+    """
+    return get_browser_pool().run(scrape_links_async(url))
 
-            # Try Firefox headless
-            browser = p.firefox.launch(headless=True)
-            page = browser.new_page()
-            try:
-                page.goto(url, timeout=10000)
-            except TimeoutError or Error:
-                print(f"Timeout occurred for {url}, skipping...")
-                browser.close()
-                return []
 
-            links = page.query_selector_all("a")
+def scrape_link_records(url, extra_fields=("rel", "title", "aria-label")):
+    """
+    Scrape links with extra anchor attributes, e.g. rel, title and aria-label.
+    """
+    return get_browser_pool().run(scrape_link_records_async(url, extra_fields))
+
 
-        extracted_data = []
+async def scrape_many_async(
+    urls, concurrency, deadline=None, scheduler=None, page_cache=None
+):
+    """
+    Scrape several URLs with at most `concurrency` pages in flight.
+    Each request first waits for its host's politeness slot in `scheduler`.
+    With a `page_cache`, cached pages the server reports as not modified are
+    not fetched and come back as None.
+    Pages still running when `deadline` (seconds) passes are cancelled.
+    """
+    scheduler = scheduler or default_scheduler
+    semaphore = asyncio.Semaphore(concurrency)
 
-        for link in links:
-            href = link.get_attribute("href")
-            anchor_text = link.inner_text().strip()
-            if href and anchor_text:
-                extracted_data.append((href, anchor_text))
+    async def scrape_one(url):
+        if page_cache is not None:
+            entry = await asyncio.to_thread(page_cache.get, url)
+            if entry is not None:
+                # The revalidation HEAD is a request too, it takes its own slot
+                async with scheduler.slot(url):
+                    if await asyncio.to_thread(page_cache.is_unchanged, url, entry):
+                        return None
 
-        browser.close()
-        return extracted_data
+        validators = {}
+        async with scheduler.slot(url, gate=semaphore):
+            links = await scrape_links_async(url, validators)
+        if page_cache is not None:
+            page_cache.set_validators(url, validators)
+        return links
+
+    tasks = {url: asyncio.ensure_future(scrape_one(url)) for url in urls}
+    if not tasks:
+        return {}
+
+    _, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        print(f"Deadline reached, cancelled {len(pending)} pending scrapes")
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    # Keep input order so results merge deterministically
+    results = {}
+    for url, task in tasks.items():
+        if task.cancelled():
+            continue
+        if task.exception():
+            print(f"Error scraping {url}: {task.exception()}")
+            continue
+        results[url] = task.result()
+
+    return results
+
+
+def scrape_many(
+    urls,
+    concurrency=DEEP_SCRAPE_CONCURRENCY,
+    deadline=DEEP_SCRAPE_DEADLINE,
+    scheduler=None,
+    page_cache=None,
+):
+    """
+    Scrape several URLs concurrently, returns {url: [(href, anchor_text), ...]}.
+    """
+    return get_browser_pool().run(
+        scrape_many_async(urls, concurrency, deadline, scheduler, page_cache)
+    )
 
 
 def preprocess_urls(url_data, base_url):
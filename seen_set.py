@@ -0,0 +1,134 @@
+import hashlib
+import math
+import os
+import threading
+import time
+
+from database import get_seen_fingerprints, save_seen_fingerprints
+from url_utils import canonicalize_url
+from config import (
+    SEEN_SET_BACKEND,
+    SEEN_TTL_HOURS,
+    BLOOM_FILTER_PATH,
+    BLOOM_FILTER_CAPACITY,
+    BLOOM_FILTER_ERROR_RATE,
+)
+
+
+def url_fingerprint(url):
+    """
+    Short, stable hash of a URL's canonical form.
+    """
+    return hashlib.sha1(canonicalize_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+class PersistentSeenSet:
+    """
+    Exact set of URLs fetched within the last ttl_hours, stored in DuckDB.
+    Loaded into memory up front, new URLs are written on flush().
+    """
+
+    def __init__(self, ttl_hours=SEEN_TTL_HOURS):
+        self.ttl = ttl_hours * 3600
+        now = time.time()
+        # fingerprint -> when it was last fetched, expires after ttl
+        self._seen = {
+            fingerprint: now - age
+            for fingerprint, age in get_seen_fingerprints(ttl_hours)
+        }
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def __contains__(self, url):
+        with self._lock:
+            seen_at = self._seen.get(url_fingerprint(url))
+        return seen_at is not None and time.time() - seen_at < self.ttl
+
+    def add(self, url):
+        fingerprint = url_fingerprint(url)
+        with self._lock:
+            self._seen[fingerprint] = time.time()
+            self._pending.append((fingerprint, url))
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            save_seen_fingerprints(pending)
+
+
+class BloomSeenSet:
+    """
+    Bloom filter seen-set for very large crawls, persisted to a file.
+    Never misses a seen URL, but may skip a few unseen ones (error_rate).
+    """
+
+    def __init__(
+        self,
+        path=BLOOM_FILTER_PATH,
+        capacity=BLOOM_FILTER_CAPACITY,
+        error_rate=BLOOM_FILTER_ERROR_RATE,
+    ):
+        self.path = path
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                saved = f.read()
+            # Size changed in config, start over rather than misread the bits
+            if len(saved) == len(self.bits):
+                self.bits = bytearray(saved)
+
+    def _positions(self, url):
+        digest = hashlib.sha256(canonicalize_url(url).encode("utf-8")).digest()
+        # Double hashing: h1 + i * h2
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, url):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(url))
+
+    def add(self, url):
+        positions = self._positions(url)
+        with self._lock:
+            for p in positions:
+                self.bits[p >> 3] |= 1 << (p & 7)
+
+    def flush(self):
+        if not self.path:
+            return
+        with self._lock:
+            bits = bytes(self.bits)
+            # Replace atomically so a crash never leaves a truncated filter
+            with open(self.path + ".tmp", "wb") as f:
+                f.write(bits)
+            os.replace(self.path + ".tmp", self.path)
+
+
+_seen_sets = {}
+_seen_sets_lock = threading.Lock()
+
+
+def make_seen_set(backend=SEEN_SET_BACKEND):
+    """
+    Return the process-wide cross-crawl seen-set configured by
+    SEEN_SET_BACKEND, loading it on first use. It is shared by every crawl,
+    so concurrent crawls see each other's pages and never overwrite each
+    other's additions. None means only dedupe within a single crawl.
+    """
+    if backend is None:
+        return None
+    if backend not in ("duckdb", "bloom"):
+        raise ValueError(f"Unknown seen-set backend: {backend}")
+
+    with _seen_sets_lock:
+        if backend not in _seen_sets:
+            if backend == "duckdb":
+                _seen_sets[backend] = PersistentSeenSet()
+            else:
+                _seen_sets[backend] = BloomSeenSet()
+        return _seen_sets[backend]
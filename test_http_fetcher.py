@@ -0,0 +1,111 @@
+"""
+HTTP-first fetch path against a local fixture server.
+
+Run with: python -m unittest test_http_fetcher
+"""
+
+import threading
+import unittest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http_fetcher import fetch_html, fetch_link_records
+
+STATIC_PAGE = b"""<html><body>
+<nav><a href="/">Home</a><a href="/about">About</a></nav>
+<a href="/finance/acfr-2024.pdf">ACFR 2024</a>
+<a href="/finance/budget" data-id="b1">Adopted <b>Budget</b></a>
+<a href="/contact">Contact</a>
+<script>var a = '<a href="/js">JS</a>';</script>
+</body></html>"""
+
+JS_SHELL_PAGE = b"""<html><body>
+<noscript>Please enable JavaScript to run this app.</noscript>
+<div id="root"></div>
+</body></html>"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/static":
+            self._send(200, "text/html; charset=utf-8", STATIC_PAGE, {"ETag": '"v1"'})
+        elif self.path == "/shell":
+            self._send(200, "text/html", JS_SHELL_PAGE)
+        elif self.path == "/report.pdf":
+            self._send(200, "application/pdf", b"%PDF-1.4")
+        elif self.path == "/truncated":
+            # Promise more bytes than are sent, then drop the connection
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", "100000")
+            self.end_headers()
+            self.wfile.write(STATIC_PAGE)
+            self.wfile.flush()
+            self.close_connection = True
+        else:
+            self._send(404, "text/html", b"<html>Not found</html>")
+
+    def _send(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep test output quiet
+
+
+class HttpFetcherTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_static_page_links(self):
+        records = fetch_link_records(f"{self.base_url}/static", ("data-id",))
+        self.assertEqual(
+            [(r["href"], r["text"]) for r in records],
+            [
+                ("/", "Home"),
+                ("/about", "About"),
+                ("/finance/acfr-2024.pdf", "ACFR 2024"),
+                ("/finance/budget", "Adopted Budget"),
+                ("/contact", "Contact"),
+            ],
+        )
+        self.assertEqual(records[3]["data-id"], "b1")
+
+    def test_get_response_validators(self):
+        validators = {}
+        fetch_html(f"{self.base_url}/static", validators=validators)
+        self.assertEqual(validators, {"etag": '"v1"', "last_modified": None})
+
+    def test_js_shell_needs_browser(self):
+        self.assertIsNone(fetch_link_records(f"{self.base_url}/shell"))
+
+    def test_non_html_response(self):
+        self.assertIsNone(fetch_html(f"{self.base_url}/report.pdf"))
+
+    def test_http_error(self):
+        self.assertIsNone(fetch_link_records(f"{self.base_url}/missing"))
+
+    def test_truncated_body_falls_back_to_browser(self):
+        self.assertIsNone(fetch_link_records(f"{self.base_url}/truncated"))
+
+    def test_connection_refused(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+        url = f"http://127.0.0.1:{server.server_address[1]}/static"
+        server.server_close()
+        self.assertIsNone(fetch_link_records(url))
+
+
+if __name__ == "__main__":
+    unittest.main()
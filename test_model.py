@@ -1,4 +1,7 @@
+import hashlib
+import os
 import pandas as pd
+import pickle
 
 from sklearn.metrics import accuracy_score, classification_report
 from url_ranking_model import UrlRanker
@@ -642,6 +645,21 @@ if __name__ == "__main__":
     print(f"Accuracy: {accuracy:.4f}")
     print("\nClassification Report:\n", report)
 
+    # Folded NumPy scorer must match the sklearn pipeline it was exported from
+    raw = b""
+    if os.path.exists(MODEL_PATH):
+        with open(MODEL_PATH, "rb") as f:
+            raw = f.read()
+    if ranker.model_version == hashlib.sha1(raw).hexdigest()[:12]:
+        pipeline = pickle.loads(raw)["model"]
+        X_test = ranker.featurize(
+            df_test["url"].tolist(), df_test["anchor_text"].tolist()
+        )
+        diff = ranker.scorer.check_equivalence(pipeline, X_test)
+        print(f"Folded scorer matches predict_proba (max diff {diff:.2e})\n")
+    else:
+        print("Model wasn't exported from model.pkl, skipping pipeline check\n")
+
     # Show sample predictions
     print("Sample Predictions:")
     print(ranked_df[["url", "anchor_text", "score", "predicted_label"]].head(10))
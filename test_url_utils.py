@@ -0,0 +1,62 @@
+"""
+URL canonicalization used by the crawler and seen-set.
+
+Run with: python -m unittest test_url_utils
+"""
+
+import unittest
+
+from url_utils import canonicalize_url
+
+
+class CanonicalizeUrlTest(unittest.TestCase):
+    def test_scheme_host_and_default_port(self):
+        self.assertEqual(
+            canonicalize_url("HTTPS://User@WWW.Example.GOV.:443/Finance/"),
+            "https://www.example.gov/Finance",
+        )
+        self.assertEqual(
+            canonicalize_url("http://example.gov:8080/a"), "http://example.gov:8080/a"
+        )
+
+    def test_ipv6_host_keeps_brackets(self):
+        self.assertEqual(canonicalize_url("http://[::1]:8080/x"), "http://[::1]:8080/x")
+        self.assertEqual(
+            canonicalize_url("https://[2001:DB8::1]:443/a/"), "https://[2001:db8::1]/a"
+        )
+
+    def test_path_segments_and_escapes(self):
+        self.assertEqual(
+            canonicalize_url("http://example.gov//a/./b/../c%2f"),
+            "http://example.gov/a/c%2F",
+        )
+
+    def test_fragment_and_tracking_params_removed(self):
+        self.assertEqual(
+            canonicalize_url("http://example.gov/p?utm_source=x&b=2&fbclid=y&a=1#top"),
+            "http://example.gov/p?a=1&b=2",
+        )
+
+    def test_bare_query_keys_stay_bare(self):
+        self.assertEqual(
+            canonicalize_url("http://example.gov/p?id"), "http://example.gov/p?id"
+        )
+        self.assertEqual(
+            canonicalize_url("http://example.gov/p?b=&id&a=1"),
+            "http://example.gov/p?a=1&b=&id",
+        )
+
+    def test_query_values_reencoded(self):
+        self.assertEqual(
+            canonicalize_url("http://example.gov/p?q=caf%c3%a9+bar&x=a%26b"),
+            "http://example.gov/p?q=caf%C3%A9+bar&x=a%26b",
+        )
+
+    def test_non_http_urls_untouched(self):
+        self.assertEqual(
+            canonicalize_url("mailto:Finance@Example.gov"), "mailto:Finance@Example.gov"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,18 @@
+import argparse
 import pandas as pd
 
 from url_ranking_model import UrlRanker
-from config import MODEL_PATH
+from embeddings import build_pruned_embeddings
+from feature_store import FeatureStore
+from database import init_db, get_feedback, get_held_out_links
+from config import (
+    MODEL_PATH,
+    EMBEDDINGS_PATH,
+    EMBEDDINGS_DRIFT_SAMPLE,
+    TRAIN_CV_FOLDS,
+    TRAIN_CHUNK_SIZE,
+    TRAIN_STREAM_EPOCHS,
+)
 
 # Training Data
 data = [
@@ -618,10 +629,67 @@ data = [
 df = pd.DataFrame(data, columns=["url", "anchor_text", "label"])
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the URL ranking model.")
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="Pick C and TF-IDF settings by k-fold grid search (TRAIN_PARAM_GRID)",
+    )
+    parser.add_argument("--cv", type=int, default=TRAIN_CV_FOLDS, help="CV folds")
+    parser.add_argument(
+        "--source",
+        help="Stream url, anchor_text, label rows from a .csv/.parquet file or a "
+        "DuckDB query instead of training on the list above",
+    )
+    parser.add_argument("--chunk-size", type=int, default=TRAIN_CHUNK_SIZE)
+    parser.add_argument("--epochs", type=int, default=TRAIN_STREAM_EPOCHS)
+    args = parser.parse_args()
+
     print("Starting Model Training for URL Ranking!")
+    init_db()
+
+    # Always train on the full GloVe table, from scratch
+    ranker = UrlRanker(embeddings_path=EMBEDDINGS_PATH, load=False)
+    feature_store = FeatureStore.for_ranker(ranker)
+
+    if args.source:
+        vocabulary = set()
+        ranker.train_streaming(
+            args.source,
+            chunk_size=args.chunk_size,
+            epochs=args.epochs,
+            feature_store=feature_store,
+            vocabulary=vocabulary,
+        )
+        print("Model training complete!")
+
+        held_out = get_held_out_links(
+            EMBEDDINGS_DRIFT_SAMPLE, training_source=args.source
+        )
+        eval_texts = list(held_out["url"] + " " + held_out["anchor_text"])
+        # Training rows aren't kept in memory, their tokens were collected
+        build_pruned_embeddings([], eval_texts=eval_texts, tokens=vocabulary)
+    else:
+        # Include labels collected through /feedback
+        feedback = get_feedback()[["url", "anchor_text", "label"]]
+        df = pd.concat([df, feedback], ignore_index=True)
+        print(f"Training on {len(df)} links ({len(feedback)} from feedback)")
+
+        ranker.train_model(
+            df,
+            save_path=MODEL_PATH,
+            search=args.search,
+            cv=args.cv,
+            feature_store=feature_store,
+        )
 
-    ranker = UrlRanker()
-    ranker.train_model(df, save_path=MODEL_PATH)
+        print("Model training complete!")
+        print("Model has been saved successfully: model.pkl")
 
-    print("Model training complete!")
-    print("Model has been saved successfully: model.pkl")
+        # Compact embedding table for ranking, saved next to the model.
+        # Drift is measured on stored links the model wasn't trained on.
+        held_out = get_held_out_links(EMBEDDINGS_DRIFT_SAMPLE, training_urls=df["url"])
+        eval_texts = list(held_out["url"] + " " + held_out["anchor_text"])
+        build_pruned_embeddings(
+            list(df["url"] + " " + df["anchor_text"]), eval_texts=eval_texts
+        )
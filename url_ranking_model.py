@@ -1,181 +1,640 @@
+import hashlib
+import multiprocessing
 import numpy as np
+import os
 import pandas as pd
 import pickle
-import gensim.downloader as api
-
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import make_pipeline
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.metrics import accuracy_score, average_precision_score, log_loss
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.pipeline import Pipeline, make_pipeline
 from sklearn.preprocessing import StandardScaler
-from fuzzywuzzy import fuzz
+from embeddings import (
+    load_word_vectors,
+    embedding_similarity,
+    embedding_fingerprint,
+    tokenize,
+)
+from linear_scorer import LinearScorer
+from model_artifact import ModelArtifact, latest_version, save_artifact
+from keyword_matching import FuzzyKeywordScorer, KeywordAutomaton
+from ranker_stats import RankerStats
+from score_cache import ScoreCache
+from database import iter_training_chunks
+from url_utils import canonicalize_url
 from config import (
     MODEL_PATH,
+    MODEL_ARTIFACT_DIR,
+    PARALLEL_CHUNK_SIZE,
+    TRAIN_CV_FOLDS,
+    TRAIN_PARAM_GRID,
+    TRAIN_SEARCH_SCORING,
+    TRAIN_CHUNK_SIZE,
+    TRAIN_STREAM_EPOCHS,
+    TRAIN_HASHING_FEATURES,
+    TRAIN_SGD_ALPHA,
     PRIORITY_KEY_WORDS,
     NON_PRIORITY_KEY_WORDS,
-    PRIORITY_MULTIPLIER,
-    NON_PRIORITY_MULTIPLIER,
 )
 from urllib.parse import urlparse
 
+# Dense features stacked after the TF-IDF columns
+EXTRA_FEATURES = ["fuzzy_score", "embedding_similarity", "url_depth_score"]
+
+# Bump whenever a feature's values change for the same input, so models
+# trained on the old definition refuse to load instead of scoring garbage.
+# 1: fuzzywuzzy partial_ratio scores (models before this constant saved none)
+FEATURE_DEFINITION_VERSION = 1
+
 
 class UrlRanker:
-    def __init__(self, model_path=MODEL_PATH):
+    def __init__(
+        self,
+        model_path=MODEL_PATH,
+        embeddings_path=None,
+        artifact_dir=MODEL_ARTIFACT_DIR,
+        load=True,
+    ):
         """
-        Init UrlRanker - Loads model from pkl if available.
+        Init UrlRanker - Loads the latest model artifact, else the pkl if available.
+        embeddings_path defaults to the pruned store if built, else full GloVe.
+        load=False skips loading, e.g. to retrain after the keyword lists changed.
         """
-        self.model = None
+        self.model = None  # sklearn pipeline, only set when trained or loaded from pkl
+        self.scorer = None  # Folded NumPy version of self.model used for ranking
+        self.model_version = None
+        self._refreshed_at = float("-inf")
         self.vectorizer = TfidfVectorizer(
             ngram_range=(1, 3), stop_words="english", max_features=500
         )
-        self.word_vectors = api.load(
-            "glove-wiki-gigaword-50"
-        )  # Load pre-trained embeddings!
+        # Pre-trained embeddings, memory-mapped from the local store
+        self.embeddings_path = embeddings_path
+        self.word_vectors = load_word_vectors(embeddings_path)
         self.model_path = model_path
-
+        self.artifact_dir = artifact_dir
+        self.fuzzy_scorer = FuzzyKeywordScorer()
+        self.score_cache = ScoreCache()
+        self.stats = RankerStats()  # Per-stage timings of every ranking call
+        # Compiled once, reused for every URL path segment
+        self.priority_matcher = KeywordAutomaton(PRIORITY_KEY_WORDS)
+        self.non_priority_matcher = KeywordAutomaton(NON_PRIORITY_KEY_WORDS)
+
+        if not load:
+            return
         try:
-            self.load_model()
+            self.load_artifact()
         except FileNotFoundError:
-            print(f"Model file '{model_path}' not found. Train a model first.")
-
-    def train_model(self, df, save_path=MODEL_PATH):
+            try:
+                self.load_model()
+            except FileNotFoundError:
+                print(f"Model file '{model_path}' not found. Train a model first.")
+
+    def train_model(
+        self,
+        df,
+        save_path=MODEL_PATH,
+        search=False,
+        cv=TRAIN_CV_FOLDS,
+        param_grid=TRAIN_PARAM_GRID,
+        feature_store=None,
+    ):
         """
         Train Logistic Regression model and save it.
+        search=True picks C and the TF-IDF settings by parallel k-fold grid
+        search, then refits the best settings on every row.
+        feature_store reuses stored extra features of rows seen by earlier runs.
         """
         df["text"] = df["url"] + " " + df["anchor_text"]
 
-        # TF-IDF feature extraction
-        X_text = self.vectorizer.fit_transform(df["text"])
+        # Fuzzy, embedding and depth features don't depend on the searched
+        # params, so they are computed once and reused by every fold
+        if feature_store is None:
+            self._add_extra_features(df)
+        else:
+            feature_store.add_features(df, self._add_extra_features)
+        y = df["label"]
+
+        if search:
+            self._search(df, y, cv, param_grid)
+            X_text = self.vectorizer.transform(df["text"])
+            X_combined = self._combine_features(X_text, df)
+        else:
+            # TF-IDF feature extraction
+            X_text = self.vectorizer.fit_transform(df["text"])
 
-        # Fuzzy matching feature
-        df["fuzzy_score"] = df["text"].apply(
-            lambda x: max(
-                [
-                    fuzz.partial_ratio(x.lower(), keyword)
-                    for keyword in PRIORITY_KEY_WORDS
-                ]
+            # Combine features, kept sparse end to end
+            X_combined = self._combine_features(X_text, df)
+
+            # Train with a test split
+            X_train, X_test, y_train, y_test = train_test_split(
+                X_combined, y, test_size=0.2, random_state=1
             )
-            * PRIORITY_MULTIPLIER
-        )
 
-        df["negative_score"] = df["text"].apply(
-            lambda x: max(
-                [fuzz.partial_ratio(x.lower(), term) for term in NON_PRIORITY_KEY_WORDS]
+            # Train model! Scaling without centering keeps X sparse, the mean
+            # shift is absorbed by the (unpenalized) intercept
+            self.model = make_pipeline(
+                StandardScaler(with_mean=False), LogisticRegression(max_iter=500)
             )
+            self.model.fit(X_train, y_train)
+
+            probs = self.model.predict_proba(X_test)[:, 1]
+            print(
+                f"Held-out accuracy {accuracy_score(y_test, probs >= 0.5):.4f}, "
+                f"average precision {average_precision_score(y_test, probs):.4f}"
+            )
+
+        # Save model
+        raw = pickle.dumps(
+            {
+                "model": self.model,
+                "vectorizer": self.vectorizer,
+                "feature_definition_version": FEATURE_DEFINITION_VERSION,
+                "embeddings_fingerprint": embedding_fingerprint(self.word_vectors),
+            }
         )
-        # Penalize these terms by 95%
-        df["fuzzy_score"] -= df["negative_score"] * NON_PRIORITY_MULTIPLIER
+        with open(save_path, "wb") as f:
+            f.write(raw)
+        self.model_version = hashlib.sha1(raw).hexdigest()[:12]
+        self.model_path = save_path
+        print(f"Model saved to {save_path}")
 
-        # Word embedding similarity
-        df["embedding_similarity"] = df["text"].apply(self._text_embedding_similarity)
+        self.export_artifact(X_combined)
 
-        # URL depth score
-        df["url_depth_score"] = df["url"].apply(self._url_depth_weighting)
+    def train_streaming(
+        self,
+        source,
+        chunk_size=TRAIN_CHUNK_SIZE,
+        epochs=TRAIN_STREAM_EPOCHS,
+        feature_store=None,
+        vocabulary=None,
+    ):
+        """
+        Out-of-core training on url, anchor_text, label rows streamed from a
+        CSV or Parquet file or a DuckDB query, one chunk in memory at a time.
 
-        domain_weight = 0.5  # Deprioritize the domain
-        X_text_scaled = X_text.toarray() * domain_weight  # Scale down text features
+        Text is hashed instead of TF-IDF weighted, so no vocabulary is kept.
+        The extra features are scaled with running statistics and an SGD
+        logistic regression is fit chunk by chunk. In the first epoch each
+        chunk is scored before it is trained on (progressive validation),
+        later epochs have seen every row so only report training loss.
 
-        # Combine features
-        X_combined = np.hstack(
-            (
-                X_text.toarray(),
-                df[["fuzzy_score", "embedding_similarity", "url_depth_score"]].values,
+        vocabulary, if given, is a set filled with the tokens of the training
+        text that are in the embedding table, e.g. for build_pruned_embeddings.
+        """
+        self.vectorizer = HashingVectorizer(
+            ngram_range=(1, 3),
+            stop_words="english",
+            n_features=TRAIN_HASHING_FEATURES,
+            alternate_sign=False,
+        )
+        scaler = StandardScaler(with_mean=False)
+        classifier = SGDClassifier(
+            loss="log_loss", alpha=TRAIN_SGD_ALPHA, random_state=1
+        )
+        classes = np.array([0, 1])
+
+        for epoch in range(epochs):
+            rows = validated = correct = 0
+            total_loss = 0.0
+            for chunk in iter_training_chunks(source, chunk_size):
+                chunk[["url", "anchor_text"]] = chunk[["url", "anchor_text"]].fillna("")
+                chunk["text"] = chunk["url"] + " " + chunk["anchor_text"]
+                if vocabulary is not None and epoch == 0:
+                    # Bounded by the embedding table, not by the row count
+                    vocabulary.update(
+                        token
+                        for text in chunk["text"]
+                        for token in tokenize(text)
+                        if token in self.word_vectors
+                    )
+                if feature_store is None:
+                    self._add_extra_features(chunk)
+                else:
+                    feature_store.add_features(chunk, self._add_extra_features)
+
+                X_text = self.vectorizer.transform(chunk["text"])
+                X_extra = chunk[EXTRA_FEATURES].to_numpy(dtype=np.float64)
+                if epoch == 0:
+                    scaler.partial_fit(X_extra)
+                X = sparse.hstack(
+                    (X_text, sparse.csr_matrix(scaler.transform(X_extra))),
+                    format="csr",
+                )
+                y = chunk["label"].to_numpy()
+
+                if rows or epoch:
+                    probs = classifier.predict_proba(X)[:, 1]
+                    correct += int(((probs >= 0.5) == y).sum())
+                    total_loss += log_loss(y, probs, labels=classes) * len(y)
+                    validated += len(y)
+
+                classifier.partial_fit(X, y, classes=classes)
+                rows += len(y)
+
+            if not rows:
+                raise ValueError(f"No training rows in '{source}'")
+            if validated:
+                # Out-of-sample only in the first epoch
+                kind = "progressive" if epoch == 0 else "training"
+                print(
+                    f"Epoch {epoch + 1}: {rows} rows, {kind} accuracy "
+                    f"{correct / validated:.4f}, log loss {total_loss / validated:.4f}"
+                )
+
+        # Fold the extra-feature scaling into the weights, hashed text is unscaled
+        scale = np.concatenate([np.ones(X_text.shape[1]), scaler.scale_])
+        self.scorer = LinearScorer(
+            classifier.coef_[0] / scale, classifier.intercept_[0], scale=scale
+        )
+        # Unscaled features of the last chunk must score the same
+        X_raw = sparse.hstack((X_text, sparse.csr_matrix(X_extra)), format="csr")
+        expected = classifier.predict_proba(X)[:, 1]
+        diff = float(np.max(np.abs(self.scorer.predict_proba(X_raw) - expected)))
+        if diff > 1e-9:
+            raise ValueError(
+                f"Folded scorer differs from predict_proba by {diff:.3g} (atol 1e-9)"
             )
+        print(f"Folded scorer matches predict_proba (max diff {diff:.2e})")
+
+        digest = hashlib.sha1(self.scorer.weights.tobytes())
+        digest.update(np.float64(self.scorer.bias).tobytes())
+        self.scorer.model_version = digest.hexdigest()[:12]
+        self.model = None
+        self.model_version = self.scorer.model_version
+        self.score_cache.clear()
+        save_artifact(
+            self.vectorizer,
+            self.scorer,
+            EXTRA_FEATURES,
+            FEATURE_DEFINITION_VERSION,
+            self.word_vectors,
+            self.artifact_dir,
         )
-        y = df["label"]
 
-        # Train with a test split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X_combined, y, test_size=0.2, random_state=1
+    def _search(self, df, y, cv, param_grid):
+        """
+        Grid search over param_grid with stratified k-fold CV on all cores.
+        TF-IDF is refit inside each fold, the precomputed extra feature
+        columns pass straight through. Keeps the best refit model.
+        """
+        pipeline = Pipeline(
+            [
+                (
+                    "features",
+                    ColumnTransformer(
+                        [
+                            ("tfidf", clone(self.vectorizer), "text"),
+                            ("extra", "passthrough", EXTRA_FEATURES),
+                        ],
+                        sparse_threshold=1.0,  # Always keep the output sparse
+                    ),
+                ),
+                ("scaler", StandardScaler(with_mean=False)),
+                ("lr", LogisticRegression(max_iter=500)),
+            ]
+        )
+        search = GridSearchCV(
+            pipeline,
+            param_grid,
+            scoring=TRAIN_SEARCH_SCORING,
+            cv=StratifiedKFold(n_splits=cv, shuffle=True, random_state=1),
+            n_jobs=-1,
+        )
+        search.fit(df[["text"] + EXTRA_FEATURES], y)
+        print(
+            f"Best CV {TRAIN_SEARCH_SCORING} {search.best_score_:.4f} "
+            f"with {search.best_params_}"
         )
 
-        # Train model!
-        self.model = make_pipeline(StandardScaler(), LogisticRegression(max_iter=500))
-        self.model.fit(X_train, y_train)
+        best = search.best_estimator_
+        self.vectorizer = best.named_steps["features"].named_transformers_["tfidf"]
+        self.model = best[1:]  # Fitted scaler + LR, same shape as make_pipeline
+        return search
 
-        # Save model
-        with open(save_path, "wb") as f:
-            pickle.dump({"model": self.model, "vectorizer": self.vectorizer}, f)
-        print(f"Model saved to {save_path}")
+    def export_artifact(self, X):
+        """
+        Fold the scaler into the LR weights, check the folded scorer against
+        predict_proba on X and publish it as a new artifact version.
+        """
+        self.scorer = LinearScorer.from_pipeline(self.model, self.model_version)
+        diff = self.scorer.check_equivalence(self.model, X)
+        print(f"Folded scorer matches predict_proba (max diff {diff:.2e})")
+        save_artifact(
+            self.vectorizer,
+            self.scorer,
+            EXTRA_FEATURES,
+            FEATURE_DEFINITION_VERSION,
+            self.word_vectors,
+            self.artifact_dir,
+        )
+
+    def load_artifact(self, artifact_dir=None, version=None):
+        """
+        Load the latest model artifact, or the given version. Raises
+        FileNotFoundError if there is none, ValueError if it doesn't match
+        the current config.
+        """
+        artifact_dir = artifact_dir or self.artifact_dir
+        if version is None:
+            artifact = ModelArtifact.load_latest(artifact_dir)
+        else:
+            artifact = ModelArtifact(os.path.join(artifact_dir, version))
+        if artifact.extra_features != EXTRA_FEATURES:
+            raise ValueError(
+                f"Model artifact '{artifact.path}' expects extra features "
+                f"{artifact.extra_features}, this ranker builds {EXTRA_FEATURES}"
+            )
+        _check_feature_definition(artifact.feature_definition_version, artifact.path)
+        self._check_embeddings(artifact.embeddings_fingerprint, artifact.path)
+        self.model = None
+        self.vectorizer = artifact.vectorizer
+        self.scorer = artifact.scorer
+        self.model_version = artifact.model_version
+        print(f"Model artifact loaded from {artifact.path}")
+
+    def load_version(self, model_version):
+        """
+        Load exactly model_version, from its artifact or else from the pkl.
+        Raises ValueError if neither holds it.
+        """
+        path = os.path.join(self.artifact_dir, model_version, "manifest.json")
+        if os.path.exists(path):
+            self.load_artifact(version=model_version)
+        else:
+            self.load_model()
+        if self.model_version != model_version:
+            raise ValueError(
+                f"Model version {model_version} is no longer available, "
+                f"found {self.model_version}"
+            )
+
+    def refresh(self, min_interval=0):
+        """
+        Load the artifact LATEST names if another process published a newer
+        one, checking at most every min_interval seconds. Returns True if a
+        new model was loaded.
+        """
+        now = time.monotonic()
+        if now - self._refreshed_at < min_interval:
+            return False
+        self._refreshed_at = now
+        version = latest_version(self.artifact_dir)
+        if version is None or version == self.model_version:
+            return False
+        self.load_artifact()
+        return True
+
+    def _check_embeddings(self, fingerprint, path):
+        """
+        Raise ValueError unless the loaded embedding table is the one the model
+        was trained on, or a table pruned from it.
+        """
+        loaded = embedding_fingerprint(self.word_vectors)
+        source = getattr(self.word_vectors, "source_fingerprint", None)
+        if fingerprint is None or fingerprint not in (loaded, source):
+            raise ValueError(
+                f"Model '{path}' was trained on embedding table {fingerprint}, "
+                f"the loaded table is {loaded} (pruned from {source}). Rebuild "
+                "the pruned table or retrain with the table you rank with."
+            )
 
     def load_model(self, model_path=None):
         """
-        Load pre-trained model from file.
+        Load pre-trained model from a pkl file.
         """
         path = model_path if model_path else self.model_path
         with open(path, "rb") as f:
-            data = pickle.load(f)
-            self.model = data["model"]
-            self.vectorizer = data["vectorizer"]
+            raw = f.read()
+        data = pickle.loads(raw)
+        _check_feature_definition(data.get("feature_definition_version", 1), path)
+        if data.get("embeddings_fingerprint"):
+            self._check_embeddings(data["embeddings_fingerprint"], path)
+        self.model = data["model"]
+        self.vectorizer = data["vectorizer"]
+        # Identifies the trained model, e.g. for cached scores
+        self.model_version = hashlib.sha1(raw).hexdigest()[:12]
         print(f"Model loaded from {path}")
 
+        self.scorer = LinearScorer.from_pipeline(self.model, self.model_version)
+
+    def partial_fit(self, urls, anchor_texts, labels):
+        """
+        Nudge the loaded model toward labeled links and publish it as a new
+        artifact version. The scorer is swapped in place, so ranking picks up
+        the update without a restart, and the new model_version retires the
+        cached scores. Returns the new model version.
+
+        Other processes may publish too, call refresh() under
+        model_artifact.artifact_lock first (see feedback.py).
+        """
+        if self.scorer is None:
+            raise ValueError("Model not loaded. Train or load a model first.")
+
+        X = self.featurize(urls, anchor_texts)
+        scorer = self.scorer.partial_fit(X, labels)
+        digest = hashlib.sha1(self.model_version.encode("utf-8"))
+        digest.update(scorer.weights.tobytes())
+        digest.update(np.float64(scorer.bias).tobytes())
+        scorer.model_version = digest.hexdigest()[:12]
+
+        save_artifact(
+            self.vectorizer,
+            scorer,
+            EXTRA_FEATURES,
+            FEATURE_DEFINITION_VERSION,
+            self.word_vectors,
+            self.artifact_dir,
+            parent_version=self.model_version,
+        )
+        # The pipeline no longer describes the ranking model
+        self.model = None
+        self.scorer = scorer
+        self.model_version = scorer.model_version
+        self.score_cache.clear()
+        return self.model_version
+
     def rank_urls(self, urls, anchor_texts):
         """
         Rank URLs based on probability of relevance.
+        Links already scored by this model are served from the score cache.
+        """
+        df = pd.DataFrame({"url": urls, "anchor_text": anchor_texts})
+
+        # Predict relevance scores
+        df["score"] = self._cached_scores(df)
+
+        # Sort by relevance
+        df = df.sort_values(by="score", ascending=False)
+
+        # Return url, score, and anchor_text
+        return df[["url", "score", "anchor_text"]]
+
+    def rank_pages(self, pages):
+        """
+        Rank the links of many pages in one pass.
+        pages maps scraped_from -> (urls, anchor_texts), returns scraped_from ->
+        ranked DataFrame (url, score, anchor_text, scraped_from).
+        """
+        frames = [
+            pd.DataFrame(
+                {"url": urls, "anchor_text": anchor_texts, "scraped_from": page}
+            )
+            for page, (urls, anchor_texts) in pages.items()
+        ]
+        if not frames:
+            return {}
+
+        df = pd.concat(frames, ignore_index=True)
+        df["score"] = self._cached_scores(df)
+
+        ranked = {}
+        for page, page_df in df.groupby("scraped_from", sort=False):
+            page_df = page_df.sort_values(by="score", ascending=False)
+            ranked[page] = page_df[
+                ["url", "score", "anchor_text", "scraped_from"]
+            ].reset_index(drop=True)
+        return ranked
+
+    def rank_urls_parallel(
+        self, urls, anchor_texts, workers=None, chunk_size=PARALLEL_CHUNK_SIZE
+    ):
         """
-        if not self.model:
+        Score a very large link set across a process pool, e.g. to re-score
+        the whole links table after a model update.
+
+        Workers load this ranker's model version and open the same
+        memory-mapped embeddings once at startup, so only the link chunks are
+        pickled. Versions published meanwhile don't mix into the run.
+        Chunks are scored in input order, returns scores aligned with urls.
+        """
+        if self.scorer is None:
             raise ValueError("Model not loaded. Train or load a model first.")
 
+        df = pd.DataFrame({"url": urls, "anchor_text": anchor_texts})
+        chunks = [
+            df.iloc[start : start + chunk_size]
+            for start in range(0, len(df), chunk_size)
+        ]
+        if not chunks:
+            return np.zeros(0, dtype=np.float64)
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                self.model_path,
+                self.embeddings_path,
+                self.artifact_dir,
+                self.model_version,
+            ),
+        ) as executor:
+            scores = list(executor.map(_score_chunk, chunks))
+
+        return np.concatenate(scores)
+
+    def _cached_scores(self, df):
+        """
+        Scores for df's url/anchor_text rows, featurizing only cache misses.
+        """
+        if self.scorer is None:
+            raise ValueError("Model not loaded. Train or load a model first.")
+
+        # Nav, footer and social links repeat on every page of a site
+        with self.stats.stage("cache_lookup", len(df)):
+            keys = [
+                (canonicalize_url(url), anchor_text, self.model_version)
+                for url, anchor_text in zip(df["url"], df["anchor_text"])
+            ]
+            scores = [self.score_cache.get(key) for key in keys]
+
+        # Featurize each distinct missing link once
+        missing = {}
+        for i, (key, score) in enumerate(zip(keys, scores)):
+            if score is None:
+                missing.setdefault(key, i)
+
+        if missing:
+            rows = df.iloc[list(missing.values())]
+            new_scores = dict(zip(missing, self._score(rows)))
+            for key, score in new_scores.items():
+                self.score_cache.put(key, score)
+            scores = [
+                new_scores[key] if score is None else score
+                for key, score in zip(keys, scores)
+            ]
+
+        return np.asarray(scores, dtype=np.float64)
+
+    def featurize(self, urls, anchor_texts):
+        """
+        Sparse feature matrix (TF-IDF + extra features) for links.
+        """
         df = pd.DataFrame({"url": urls, "anchor_text": anchor_texts})
         df["text"] = df["url"] + " " + df["anchor_text"]
 
         # Transform text using TF-IDF
-        X_text = self.vectorizer.transform(df["text"])
-
-        # Fuzzy matching feature
-        df["fuzzy_score"] = df["text"].apply(
-            lambda x: max(
-                [
-                    fuzz.partial_ratio(x.lower(), keyword)
-                    for keyword in PRIORITY_KEY_WORDS
-                ]
-            )
-            * PRIORITY_MULTIPLIER
-        )
+        with self.stats.stage("tfidf", len(df)):
+            X_text = self.vectorizer.transform(df["text"])
 
-        df["negative_score"] = df["text"].apply(
-            lambda x: max(
-                [fuzz.partial_ratio(x.lower(), term) for term in NON_PRIORITY_KEY_WORDS]
-            )
-        )
-        # Penalize these terms by 95%
-        df["fuzzy_score"] -= df["negative_score"] * NON_PRIORITY_MULTIPLIER
+        self._add_extra_features(df)
 
-        # Word embedding similarity
-        df["embedding_similarity"] = df["text"].apply(self._text_embedding_similarity)
+        # Combine features
+        return self._combine_features(X_text, df)
 
-        # URL depth score
-        df["url_depth_score"] = df["url"].apply(self._url_depth_weighting)
+    def _add_extra_features(self, df):
+        """
+        Add the EXTRA_FEATURES columns to df, which has url and text columns.
+        """
+        rows = len(df)
 
-        # Combine features
-        X_combined = np.hstack(
-            (
-                X_text.toarray(),
-                df[["fuzzy_score", "embedding_similarity", "url_depth_score"]].values,
+        # Fuzzy matching feature, non-priority terms penalized by 95%
+        with self.stats.stage("fuzzy", rows):
+            df["fuzzy_score"] = self.fuzzy_scorer.score(df["text"])
+
+        # Word embedding similarity
+        with self.stats.stage("embedding", rows):
+            df["embedding_similarity"] = df["text"].apply(
+                self._text_embedding_similarity
             )
-        )
 
-        # Predict relevance scores
-        df["score"] = self.model.predict_proba(X_combined)[:, 1]
+        # URL depth score
+        with self.stats.stage("depth", rows):
+            df["url_depth_score"] = df["url"].apply(self._url_depth_weighting)
 
-        # Sort by relevance
-        df = df.sort_values(by="score", ascending=False)
+    def _score(self, df):
+        """
+        Featurize links and predict their relevance probabilities.
+        """
+        X_combined = self.featurize(df["url"].tolist(), df["anchor_text"].tolist())
+        with self.stats.stage("predict", X_combined.shape[0]):
+            return self._predict_proba(X_combined)
 
-        # Return url, score, and anchor_text
-        return df[["url", "score", "anchor_text"]]
+    def _combine_features(self, X_text, df):
+        """
+        Stack the sparse TF-IDF matrix with the dense extra features as CSR.
+        """
+        X_extra = sparse.csr_matrix(df[EXTRA_FEATURES].to_numpy(dtype=np.float64))
+        return sparse.hstack((X_text, X_extra), format="csr")
+
+    def _predict_proba(self, X):
+        """
+        Relevance probability for each row of the sparse feature matrix.
+        """
+        return self.scorer.predict_proba(X)
 
     def _text_embedding_similarity(self, text):
         """
         Compute average word embedding similarity for a given text.
         """
-        words = text.lower().split()
-        vectors = [
-            self.word_vectors[word] for word in words if word in self.word_vectors
-        ]
-        if vectors:
-            avg_vector = np.mean(vectors, axis=0)
-            return np.linalg.norm(avg_vector)  # Convert vector to a single value
-        return 0
+        return embedding_similarity(self.word_vectors, text)
 
     def _url_depth_weighting(self, url):
         """
@@ -202,12 +661,39 @@ class UrlRanker:
             depth_weight = (i + 1) ** 2.0
 
             # Stronger weight for deep prio words
-            if any(keyword in part.lower() for keyword in PRIORITY_KEY_WORDS):
+            if self.priority_matcher.matches(part):
                 total_weight += 1.5 * depth_weight
 
             # Stronger penalty for deep non prio words
-            if any(term in part.lower() for term in NON_PRIORITY_KEY_WORDS):
+            if self.non_priority_matcher.matches(part):
                 total_penalty += 2.0 * depth_weight
 
         # Normalize by total depth
         return (total_weight - total_penalty) / depth
+
+
+def _check_feature_definition(version, path):
+    """
+    Raise ValueError if a saved model was trained on other feature definitions.
+    """
+    if version != FEATURE_DEFINITION_VERSION:
+        raise ValueError(
+            f"Model '{path}' was trained on feature definition version {version}, "
+            f"this ranker computes version {FEATURE_DEFINITION_VERSION}. "
+            "Retrain the model with train_model.py."
+        )
+
+
+# Per-process ranker used by rank_urls_parallel workers
+_worker_ranker = None
+
+
+def _init_worker(model_path, embeddings_path, artifact_dir, model_version):
+    global _worker_ranker
+    _worker_ranker = UrlRanker(model_path, embeddings_path, artifact_dir, load=False)
+    # The parent's model, not whatever LATEST names by now
+    _worker_ranker.load_version(model_version)
+
+
+def _score_chunk(df):
+    return _worker_ranker._score(df)
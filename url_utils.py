@@ -0,0 +1,87 @@
+import re
+import tldextract
+
+from urllib.parse import urlsplit, urlunsplit, quote_plus, unquote_plus
+from config import TRACKING_PARAMS
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Bundled public suffix list snapshot, never fetched at runtime
+_extract_domain = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+
+def _is_tracking_param(key):
+    key = key.lower()
+    return key.startswith("utm_") or key in TRACKING_PARAMS
+
+
+def canonicalize_url(url):
+    """
+    Canonical form of an absolute http(s) URL so the same page always maps to
+    the same string:
+    - Lowercases scheme and host, drops default ports and user info.
+    - Removes fragments and tracking params, sorts the remaining query params.
+    - Resolves dot segments and collapses duplicate slashes.
+    - Removes the trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        return url.strip().rstrip("/")
+
+    host = (parts.hostname or "").rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"  # hostname drops the IPv6 brackets
+    try:
+        port = parts.port
+    except ValueError:
+        port = None  # Malformed port, drop it
+    netloc = host
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{host}:{port}"
+
+    # Remove duplicate slashes and resolve "." / ".." segments
+    segments = []
+    for segment in re.sub(r"/{2,}", "/", parts.path).split("/"):
+        if segment == "..":
+            if segments:
+                segments.pop()
+        elif segment not in ("", "."):
+            segments.append(segment)
+    path = "/" + "/".join(segments) if segments else ""
+
+    # Uppercase percent-escapes so %2f and %2F are the same URL
+    path = re.sub(r"%[0-9a-fA-F]{2}", lambda m: m.group(0).upper(), path)
+
+    # Split by hand so a bare key like "?id" stays bare instead of "?id="
+    params = []
+    for param in parts.query.split("&"):
+        key, sep, value = param.partition("=")
+        key, value = unquote_plus(key), unquote_plus(value)
+        if param and not _is_tracking_param(key):
+            params.append((key, sep, value))
+    query = "&".join(
+        quote_plus(key) + sep + quote_plus(value) for key, sep, value in sorted(params)
+    )
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def registrable_domain(host):
+    """
+    Registrable domain per the public suffix list, e.g. www.a2gov.org ->
+    a2gov.org but ci.ann-arbor.mi.us -> ci.ann-arbor.mi.us (mi.us and
+    ann-arbor.mi.us are suffixes). None for IPs and bare suffixes.
+    """
+    return _extract_domain(host.lower()).registered_domain or None
+
+
+def same_site(host, other):
+    """
+    True if both hosts are the same, or share a registrable domain.
+    """
+    host, other = host.lower(), other.lower()
+    if host == other:
+        return True
+    site = registrable_domain(host)
+    return site is not None and site == registrable_domain(other)